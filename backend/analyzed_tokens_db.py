@@ -17,12 +17,21 @@ The database files are protected by .gitignore.
 ============================================================================
 """
 
-import json
+import logging
 import os
+import queue
+import re
 import sqlite3
-from contextlib import contextmanager
+import threading
+from contextlib import contextmanager, suppress
 from datetime import datetime
-from typing import Dict, List, Optional
+from functools import lru_cache
+from itertools import groupby
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+
+logger = logging.getLogger(__name__)
 
 # Use absolute path to ensure database is always in the backend directory
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -30,7 +39,18 @@ DATABASE_FILE = os.path.join(SCRIPT_DIR, "analyzed_tokens.db")
 ANALYSIS_RESULTS_DIR = os.path.join(SCRIPT_DIR, "analysis_results")
 AXIOM_EXPORTS_DIR = os.path.join(SCRIPT_DIR, "axiom_exports")
 
+# Directory prefixes (with trailing separator) for building and rewriting file paths
+_ANALYSIS_PREFIX = os.path.join(ANALYSIS_RESULTS_DIR, "")
+_ANALYSIS_TRASH_PREFIX = os.path.join(ANALYSIS_RESULTS_DIR, "trash", "")
+_AXIOM_PREFIX = os.path.join(AXIOM_EXPORTS_DIR, "")
+_AXIOM_TRASH_PREFIX = os.path.join(AXIOM_EXPORTS_DIR, "trash", "")
+
+# \w is str.isalnum() plus underscore, so underscore is excluded explicitly
+_FILENAME_UNSAFE_CHARS = re.compile(r"[^\w-]|_")
+_REPEATED_HYPHENS = re.compile(r"-{2,}")
+
 
+@lru_cache(maxsize=4096)
 def sanitize_filename(text: str, max_length: int = 50) -> str:
     """
     Sanitize a string for use in filenames.
@@ -42,15 +62,10 @@ def sanitize_filename(text: str, max_length: int = 50) -> str:
     Returns:
         Sanitized filename-safe string
     """
-    # Convert to lowercase
-    text = text.lower()
-    # Replace spaces with hyphens
-    text = text.replace(" ", "-")
-    # Remove any character that isn't alphanumeric or hyphen
-    text = "".join(c for c in text if c.isalnum() or c == "-")
-    # Remove consecutive hyphens
-    while "--" in text:
-        text = text.replace("--", "-")
+    # Lowercase, turn spaces into hyphens and drop anything that isn't alphanumeric or a hyphen
+    text = _FILENAME_UNSAFE_CHARS.sub("", text.lower().replace(" ", "-"))
+    # Collapse consecutive hyphens
+    text = _REPEATED_HYPHENS.sub("-", text)
     # Trim hyphens from start/end
     text = text.strip("-")
     # Truncate to max length
@@ -66,13 +81,8 @@ def get_analysis_file_path(token_id: int, token_name: str, in_trash: bool = Fals
     Format: {id}_{sanitized-name}.json
     Example: 20_eugene-the-meme.json
     """
-    sanitized_name = sanitize_filename(token_name)
-    filename = f"{token_id}_{sanitized_name}.json"
-
-    if in_trash:
-        return os.path.join(ANALYSIS_RESULTS_DIR, "trash", filename)
-    else:
-        return os.path.join(ANALYSIS_RESULTS_DIR, filename)
+    prefix = _ANALYSIS_TRASH_PREFIX if in_trash else _ANALYSIS_PREFIX
+    return f"{prefix}{token_id}_{sanitize_filename(token_name)}.json"
 
 
 def get_axiom_file_path(token_id: int, acronym: str, in_trash: bool = False) -> str:
@@ -82,13 +92,26 @@ def get_axiom_file_path(token_id: int, acronym: str, in_trash: bool = False) ->
     Format: {id}_{acronym}.json
     Example: 20_em.json
     """
-    sanitized_acronym = sanitize_filename(acronym, max_length=10)
-    filename = f"{token_id}_{sanitized_acronym}.json"
+    prefix = _AXIOM_TRASH_PREFIX if in_trash else _AXIOM_PREFIX
+    return f"{prefix}{token_id}_{sanitize_filename(acronym, max_length=10)}.json"
+
+
+def _move_file(src: str, dst: str) -> bool:
+    """
+    Rename src to dst.
 
-    if in_trash:
-        return os.path.join(AXIOM_EXPORTS_DIR, "trash", filename)
-    else:
-        return os.path.join(AXIOM_EXPORTS_DIR, filename)
+    Returns:
+        False if src does not exist (never written or already gone), True once moved
+    """
+    try:
+        os.replace(src, dst)
+    except FileNotFoundError:
+        if not os.path.exists(src):
+            return False
+        # The destination folder is missing (first move, or trash was cleared by hand)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        os.replace(src, dst)
+    return True
 
 
 def move_files_to_trash(token_id: int):
@@ -99,15 +122,8 @@ def move_files_to_trash(token_id: int):
         Tuple of (analysis_moved, axiom_moved)
     """
     with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT analysis_file_path, axiom_file_path
-            FROM analyzed_tokens
-            WHERE id = ?
-        """,
-            (token_id,),
-        )
+        cursor = _plain_cursor(conn)
+        cursor.execute(_SQL_TOKEN_FILE_PATHS, (token_id,))
         row = cursor.fetchone()
 
         if not row:
@@ -117,31 +133,30 @@ def move_files_to_trash(token_id: int):
         analysis_moved = False
         axiom_moved = False
 
-        # Create trash directories if they don't exist
-        os.makedirs(os.path.join(ANALYSIS_RESULTS_DIR, "trash"), exist_ok=True)
-        os.makedirs(os.path.join(AXIOM_EXPORTS_DIR, "trash"), exist_ok=True)
-
         # Move analysis file
-        if analysis_path and os.path.exists(analysis_path):
-            trash_path = analysis_path.replace(ANALYSIS_RESULTS_DIR, os.path.join(ANALYSIS_RESULTS_DIR, "trash"))
+        if analysis_path:
+            trash_path = f"{_ANALYSIS_TRASH_PREFIX}{os.path.basename(analysis_path)}"
             try:
-                os.rename(analysis_path, trash_path)
-                cursor.execute("UPDATE analyzed_tokens SET analysis_file_path = ? WHERE id = ?", (trash_path, token_id))
-                analysis_moved = True
+                if _move_file(analysis_path, trash_path):
+                    analysis_path = trash_path
+                    analysis_moved = True
             except Exception as e:
-                print(f"[WARN] Failed to move analysis file: {e}")
+                logger.warning("Failed to move analysis file: %s", e)
 
         # Move axiom file
-        if axiom_path and os.path.exists(axiom_path):
-            trash_path = axiom_path.replace(AXIOM_EXPORTS_DIR, os.path.join(AXIOM_EXPORTS_DIR, "trash"))
+        if axiom_path:
+            trash_path = f"{_AXIOM_TRASH_PREFIX}{os.path.basename(axiom_path)}"
             try:
-                os.rename(axiom_path, trash_path)
-                cursor.execute("UPDATE analyzed_tokens SET axiom_file_path = ? WHERE id = ?", (trash_path, token_id))
-                axiom_moved = True
+                if _move_file(axiom_path, trash_path):
+                    axiom_path = trash_path
+                    axiom_moved = True
             except Exception as e:
-                print(f"[WARN] Failed to move axiom file: {e}")
+                logger.warning("Failed to move axiom file: %s", e)
+
+        # Record both new locations in one UPDATE (unmoved files keep their current path)
+        if analysis_moved or axiom_moved:
+            cursor.execute(_SQL_UPDATE_FILE_PATHS, (analysis_path, axiom_path, token_id))
 
-        conn.commit()
         return (analysis_moved, axiom_moved)
 
 
@@ -153,15 +168,8 @@ def restore_files_from_trash(token_id: int):
         Tuple of (analysis_restored, axiom_restored)
     """
     with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT analysis_file_path, axiom_file_path
-            FROM analyzed_tokens
-            WHERE id = ?
-        """,
-            (token_id,),
-        )
+        cursor = _plain_cursor(conn)
+        cursor.execute(_SQL_TOKEN_FILE_PATHS, (token_id,))
         row = cursor.fetchone()
 
         if not row:
@@ -172,28 +180,29 @@ def restore_files_from_trash(token_id: int):
         axiom_restored = False
 
         # Restore analysis file
-        if analysis_path and "trash" in analysis_path and os.path.exists(analysis_path):
-            restored_path = analysis_path.replace(os.path.join(ANALYSIS_RESULTS_DIR, "trash"), ANALYSIS_RESULTS_DIR)
+        if analysis_path and "trash" in analysis_path:
+            restored_path = f"{_ANALYSIS_PREFIX}{os.path.basename(analysis_path)}"
             try:
-                os.rename(analysis_path, restored_path)
-                cursor.execute(
-                    "UPDATE analyzed_tokens SET analysis_file_path = ? WHERE id = ?", (restored_path, token_id)
-                )
-                analysis_restored = True
+                if _move_file(analysis_path, restored_path):
+                    analysis_path = restored_path
+                    analysis_restored = True
             except Exception as e:
-                print(f"[WARN] Failed to restore analysis file: {e}")
+                logger.warning("Failed to restore analysis file: %s", e)
 
         # Restore axiom file
-        if axiom_path and "trash" in axiom_path and os.path.exists(axiom_path):
-            restored_path = axiom_path.replace(os.path.join(AXIOM_EXPORTS_DIR, "trash"), AXIOM_EXPORTS_DIR)
+        if axiom_path and "trash" in axiom_path:
+            restored_path = f"{_AXIOM_PREFIX}{os.path.basename(axiom_path)}"
             try:
-                os.rename(axiom_path, restored_path)
-                cursor.execute("UPDATE analyzed_tokens SET axiom_file_path = ? WHERE id = ?", (restored_path, token_id))
-                axiom_restored = True
+                if _move_file(axiom_path, restored_path):
+                    axiom_path = restored_path
+                    axiom_restored = True
             except Exception as e:
-                print(f"[WARN] Failed to restore axiom file: {e}")
+                logger.warning("Failed to restore axiom file: %s", e)
+
+        # Record both new locations in one UPDATE (unrestored files keep their current path)
+        if analysis_restored or axiom_restored:
+            cursor.execute(_SQL_UPDATE_FILE_PATHS, (analysis_path, axiom_path, token_id))
 
-        conn.commit()
         return (analysis_restored, axiom_restored)
 
 
@@ -204,42 +213,41 @@ def delete_token_files(token_id: int):
     Returns:
         Tuple of (analysis_deleted, axiom_deleted)
     """
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT analysis_file_path, axiom_file_path
-            FROM analyzed_tokens
-            WHERE id = ?
-        """,
-            (token_id,),
-        )
+    with get_db_connection(readonly=True) as conn:
+        cursor = _plain_cursor(conn)
+        cursor.execute(_SQL_TOKEN_FILE_PATHS, (token_id,))
         row = cursor.fetchone()
 
-        if not row:
-            return (False, False)
-
-        analysis_path, axiom_path = row[0], row[1]
-        analysis_deleted = False
-        axiom_deleted = False
+    # Unknown token, or one saved before file paths were recorded
+    if not row or not (row[0] or row[1]):
+        return (False, False)
 
-        # Delete analysis file
-        if analysis_path and os.path.exists(analysis_path):
-            try:
-                os.remove(analysis_path)
-                analysis_deleted = True
-            except Exception as e:
-                print(f"[WARN] Failed to delete analysis file: {e}")
+    # The connection is back in the pool before touching the filesystem
+    analysis_path, axiom_path = row
+    analysis_deleted = False
+    axiom_deleted = False
 
-        # Delete axiom file
-        if axiom_path and os.path.exists(axiom_path):
-            try:
-                os.remove(axiom_path)
-                axiom_deleted = True
-            except Exception as e:
-                print(f"[WARN] Failed to delete axiom file: {e}")
+    # Delete analysis file
+    if analysis_path:
+        try:
+            os.remove(analysis_path)
+            analysis_deleted = True
+        except FileNotFoundError:
+            pass  # File was never written or is already gone
+        except Exception as e:
+            logger.warning("Failed to delete analysis file: %s", e)
+
+    # Delete axiom file
+    if axiom_path:
+        try:
+            os.remove(axiom_path)
+            axiom_deleted = True
+        except FileNotFoundError:
+            pass  # File was never written or is already gone
+        except Exception as e:
+            logger.warning("Failed to delete axiom file: %s", e)
 
-        return (analysis_deleted, axiom_deleted)
+    return (analysis_deleted, axiom_deleted)
 
 
 def update_token_file_paths(token_id: int, analysis_path: str, axiom_path: str) -> bool:
@@ -256,37 +264,646 @@ def update_token_file_paths(token_id: int, analysis_path: str, axiom_path: str)
     """
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute(
-            """
-            UPDATE analyzed_tokens
-            SET analysis_file_path = ?, axiom_file_path = ?
-            WHERE id = ?
-        """,
-            (analysis_path, axiom_path, token_id),
-        )
+        cursor.execute(_SQL_UPDATE_FILE_PATHS, (analysis_path, axiom_path, token_id))
         return cursor.rowcount > 0
 
 
-@contextmanager
-def get_db_connection():
-    """Context manager for database connections"""
-    conn = sqlite3.connect(DATABASE_FILE)
-    conn.row_factory = sqlite3.Row  # Enable dict-like access
+# Bump whenever init_database gains a new table, index or migration
+SCHEMA_VERSION = 8
+
+# Per-connection PRAGMAs (journal_mode=WAL is persistent and set once in init_database)
+# - synchronous=NORMAL: in WAL mode, only fsync at checkpoints instead of every commit
+# - busy_timeout: wait for a competing writer instead of failing with "database is locked"
+# - foreign_keys: enforce the ON DELETE CASCADE clauses declared in the schema
+# - mmap_size: read pages through a shared memory map instead of read() into each connection's cache
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA mmap_size=268435456",
+)
+
+# SQLite 3.35+ can return the upserted row id directly, saving a follow-up SELECT
+UPSERT_RETURNING_ID = " RETURNING id" if sqlite3.sqlite_version_info >= (3, 35, 0) else ""
+
+# Prepared statements cached per connection (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+
+def _fts5_trigram_available() -> bool:
+    """Check whether this SQLite build ships FTS5 with the trigram tokenizer (3.34+)"""
     try:
-        yield conn
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
+        with sqlite3.connect(":memory:") as probe:
+            probe.execute("CREATE VIRTUAL TABLE probe USING fts5(x, tokenize='trigram')")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+# Substring search index over token and wallet fields (see _init_search_index)
+FTS_ENABLED = _fts5_trigram_available()
+
+# The trigram tokenizer cannot match queries shorter than three characters
+FTS_MIN_QUERY_LENGTH = 3
+
+# Maximum number of idle read-only connections kept open between calls
+MAX_IDLE_READERS = 8
+
+
+class _ConnectionPool:
+    """
+    Long-lived connections for one database file.
+
+    SQLite allows a single writer at a time, so there is exactly one writable
+    connection, guarded by a re-entrant lock (nested helpers such as
+    soft_delete_token -> move_files_to_trash share it, and its transaction,
+    on the same thread).
+    Readers use additional WAL connections from a LIFO stack so the most
+    recently used connection, with the warmest page cache, is handed out first.
+    """
+
+    def __init__(self, database_file: str):
+        self.database_file = database_file
+        self.readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=MAX_IDLE_READERS)
+        self.writer: Optional[sqlite3.Connection] = None
+        self.writer_lock = threading.RLock()
+        # Nesting level of get_db_connection() blocks holding the writer
+        self.writer_depth = 0
+
+    def connect(self, readonly: bool) -> sqlite3.Connection:
+        """Open and configure a new connection"""
+        conn = sqlite3.connect(self.database_file, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        if readonly:
+            conn.execute("PRAGMA query_only=1")
+        return conn
+
+    def acquire_reader(self) -> sqlite3.Connection:
+        try:
+            return self.readers.get_nowait()
+        except queue.Empty:
+            return self.connect(readonly=True)
+
+    def release_reader(self, conn: sqlite3.Connection):
+        try:
+            self.readers.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        """Close all idle connections"""
+        while True:
+            try:
+                self.readers.get_nowait().close()
+            except queue.Empty:
+                break
+        with self.writer_lock:
+            if self.writer is not None:
+                # Refresh planner statistics once per connection lifetime rather than after every write
+                with suppress(sqlite3.Error):
+                    self.writer.execute("PRAGMA optimize")
+                self.writer.close()
+                self.writer = None
+
+
+_pool: Optional[_ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> _ConnectionPool:
+    """Return the pool for the current DATABASE_FILE, replacing it if the path changed"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.database_file != DATABASE_FILE:
+            if _pool is not None:
+                _pool.close()
+            _pool = _ConnectionPool(DATABASE_FILE)
+        return _pool
+
+
+def close_db_connections():
+    """Close all pooled database connections (e.g. on shutdown or before swapping files)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+@contextmanager
+def get_db_connection(readonly: bool = False):
+    """
+    Context manager for pooled database connections.
+
+    Args:
+        readonly: Use a shared read-only connection instead of the single writer
+
+    Commits on success and rolls back on error before returning the
+    connection to the pool. Writer blocks nested on the same thread join the
+    outer transaction, which only the outermost block commits or rolls back.
+    """
+    pool = _get_pool()
+
+    if readonly:
+        conn = pool.acquire_reader()
+        try:
+            yield conn
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            pool.release_reader(conn)
+        return
+
+    with pool.writer_lock:
+        if pool.writer is None:
+            pool.writer = pool.connect(readonly=False)
+        conn = pool.writer
+        outermost = pool.writer_depth == 0
+        pool.writer_depth += 1
+        try:
+            yield conn
+            if outermost:
+                conn.commit()
+        except Exception as e:
+            if outermost:
+                conn.rollback()
+            raise e
+        finally:
+            pool.writer_depth -= 1
+
+
+def _plain_cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+    """Cursor yielding plain tuples, for positional reads and results converted to dicts in bulk"""
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    return cursor
+
+
+def _rows_as_dicts(cursor: sqlite3.Cursor) -> List[Dict]:
+    """Build result dicts from a _plain_cursor; zipping tuples is cheaper than dict(sqlite3.Row)"""
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor]
+
+
+# ============================================================================
+# SQL statements for hot paths
+# ============================================================================
+# Reusing the same string objects lets the sqlite3 statement cache skip re-parsing
+
+_SQL_UPSERT_TOKEN = (
+    """
+    INSERT INTO analyzed_tokens (
+        token_address, token_name, token_symbol, acronym,
+        first_buy_timestamp, wallets_found, axiom_json, credits_used, last_analysis_credits
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(token_address) DO UPDATE SET
+        token_name = excluded.token_name,
+        token_symbol = excluded.token_symbol,
+        acronym = excluded.acronym,
+        analysis_timestamp = CURRENT_TIMESTAMP,
+        first_buy_timestamp = excluded.first_buy_timestamp,
+        wallets_found = excluded.wallets_found,
+        axiom_json = excluded.axiom_json,
+        credits_used = analyzed_tokens.credits_used + excluded.credits_used,
+        last_analysis_credits = excluded.last_analysis_credits
+"""
+    + UPSERT_RETURNING_ID
+)
+
+_SQL_TOKEN_FILE_PATHS = """
+    SELECT analysis_file_path, axiom_file_path
+    FROM analyzed_tokens
+    WHERE id = ?
+"""
+
+_SQL_UPDATE_FILE_PATHS = """
+    UPDATE analyzed_tokens
+    SET analysis_file_path = ?, axiom_file_path = ?
+    WHERE id = ?
+"""
+
+_SQL_INSERT_ANALYSIS_RUN = """
+    INSERT INTO analysis_runs (token_id, wallets_found, credits_used)
+    VALUES (?, ?, ?)
+"""
+
+_SQL_INSERT_EARLY_BUYER = """
+    INSERT OR IGNORE INTO early_buyer_wallets (
+        token_id, analysis_run_id, wallet_address, position, first_buy_usd,
+        total_usd, transaction_count, average_buy_usd,
+        first_buy_timestamp, axiom_name, wallet_balance_usd
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Token page plus up to 10 distinct wallets per token, most recently analyzed first.
+# {where} filters the token page; rows come back grouped by token for itertools.groupby.
+_SQL_ANALYZED_TOKENS_TEMPLATE = """
+    WITH page AS (
+        SELECT
+            id, token_address, token_name, token_symbol, acronym,
+            analysis_timestamp, first_buy_timestamp, wallets_found, credits_used, last_analysis_credits,
+            is_deleted, deleted_at
+        FROM analyzed_tokens
+        {where}
+        ORDER BY analysis_timestamp DESC
+        LIMIT ?
+    ),
+    page_wallets AS (
+        SELECT
+            ebw.token_id,
+            ebw.wallet_address,
+            ROW_NUMBER() OVER (
+                PARTITION BY ebw.token_id
+                ORDER BY MAX(ar.analysis_timestamp) DESC, MIN(ebw.position)
+            ) AS rn
+        FROM early_buyer_wallets ebw
+        JOIN analysis_runs ar ON ebw.analysis_run_id = ar.id
+        WHERE ebw.token_id IN (SELECT id FROM page)
+        GROUP BY ebw.token_id, ebw.wallet_address
+    )
+    SELECT page.*, page_wallets.wallet_address
+    FROM page
+    LEFT JOIN page_wallets ON page_wallets.token_id = page.id AND page_wallets.rn <= 10
+    ORDER BY page.analysis_timestamp DESC, page.id, page_wallets.rn
+"""
+_SQL_ANALYZED_TOKENS = _SQL_ANALYZED_TOKENS_TEMPLATE.format(where="WHERE is_deleted = 0 OR is_deleted IS NULL")
+_SQL_ANALYZED_TOKENS_WITH_DELETED = _SQL_ANALYZED_TOKENS_TEMPLATE.format(where="")
+
+# Distinct early buyers across runs come from the trigger-maintained unique_wallet_count.
+# The token routes trash by deleted_at alone, and idx_tokens_history_timestamp returns
+# the tokens without one already in order.
+_SQL_TOKENS_HISTORY = """
+    SELECT
+        id, token_address, token_name, token_symbol, acronym,
+        analysis_timestamp, first_buy_timestamp,
+        unique_wallet_count AS wallets_found,
+        credits_used, last_analysis_credits
+    FROM analyzed_tokens
+    WHERE deleted_at IS NULL OR deleted_at = ''
+    ORDER BY analysis_timestamp DESC
+"""
+
+_SQL_TOKENS_TRASH = """
+    SELECT
+        id, token_address, token_name, token_symbol, acronym,
+        analysis_timestamp, first_buy_timestamp,
+        unique_wallet_count AS wallets_found,
+        credits_used, last_analysis_credits, is_deleted, deleted_at
+    FROM analyzed_tokens
+    WHERE deleted_at IS NOT NULL
+    ORDER BY deleted_at DESC
+"""
+
+# Early buyer columns returned by the API (avoids SELECT ebw.*)
+_EARLY_BUYER_COLUMNS = """
+    ebw.id, ebw.token_id, ebw.analysis_run_id, ebw.wallet_address, ebw.position,
+    ebw.first_buy_usd, ebw.total_usd, ebw.transaction_count, ebw.average_buy_usd,
+    ebw.first_buy_timestamp, ebw.axiom_name, ebw.wallet_balance_usd"""
+
+# Every analyzed_tokens column but axiom_json, which load_axiom_json reads separately, plus the
+# latest run id: every save writes the export and a new run, so the id identifies the export
+_SQL_TOKEN_DETAILS = """
+    SELECT id, token_address, token_name, token_symbol, acronym, analysis_timestamp,
+        first_buy_timestamp, wallets_found, webhook_id, credits_used, last_analysis_credits,
+        is_deleted, deleted_at, analysis_file_path, axiom_file_path,
+        (SELECT MAX(id) FROM analysis_runs WHERE token_id = analyzed_tokens.id) AS analysis_run_id
+    FROM analyzed_tokens WHERE id = ?
+"""
+
+_SQL_TOKEN_AXIOM_JSON = "SELECT axiom_json FROM analyzed_tokens WHERE id = ?"
+
+# Wallets of the latest run only: the run is resolved first, then idx_ebw_run serves the rows in order
+_SQL_TOKEN_WALLETS = (
+    "SELECT"
+    + _EARLY_BUYER_COLUMNS
+    + """
+    FROM early_buyer_wallets ebw
+    WHERE ebw.analysis_run_id = (
+        SELECT id FROM analysis_runs
+        WHERE token_id = ?
+        ORDER BY analysis_timestamp DESC, id DESC
+        LIMIT 1
+    )
+    ORDER BY ebw.position ASC
+"""
+)
+
+# Wallets of every run, in first-buy order
+_SQL_TOKEN_ALL_WALLETS = (
+    "SELECT"
+    + _EARLY_BUYER_COLUMNS
+    + """
+    FROM early_buyer_wallets ebw
+    WHERE ebw.token_id = ?
+    ORDER BY ebw.first_buy_timestamp ASC
+"""
+)
+
+_SQL_TOKEN_ANALYSIS_HISTORY = (
+    "SELECT ar.id AS run_id, ar.analysis_timestamp, ar.wallets_found, ar.credits_used,"
+    + _EARLY_BUYER_COLUMNS
+    + """
+    FROM analysis_runs ar
+    LEFT JOIN early_buyer_wallets ebw ON ebw.analysis_run_id = ar.id
+    WHERE ar.token_id = ?
+    ORDER BY ar.analysis_timestamp DESC, ar.id DESC, ebw.position ASC
+"""
+)
+
+_SQL_WALLET_ACTIVITY = """
+    SELECT * FROM wallet_activity
+    WHERE wallet_id = ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+"""
+
+# Resolves the tracked wallet and inserts in one statement; rowcount is 0 when the
+# wallet is not tracked or the transaction signature was already recorded
+_SQL_INSERT_WALLET_ACTIVITY = """
+    INSERT OR IGNORE INTO wallet_activity (
+        wallet_id, transaction_signature, timestamp,
+        activity_type, description, sol_amount,
+        token_amount, recipient_address
+    )
+    SELECT id, ?, ?, ?, ?, ?, ?, ?
+    FROM early_buyer_wallets
+    WHERE wallet_address = ?
+    LIMIT 1
+"""
+
+_SQL_RECENT_ACTIVITY = """
+    SELECT
+        wa.*,
+        ebw.wallet_address,
+        ebw.axiom_name,
+        at.token_name,
+        at.acronym
+    FROM wallet_activity wa
+    JOIN early_buyer_wallets ebw ON wa.wallet_id = ebw.id
+    JOIN analyzed_tokens at ON ebw.token_id = at.id
+    ORDER BY wa.timestamp DESC
+    LIMIT ?
+"""
+
+
+_SQL_UPDATE_WALLET_BALANCE = """
+    UPDATE early_buyer_wallets
+    SET wallet_balance_usd = ?
+    WHERE wallet_address = ?
+"""
+
+# Only the (wallet_address, tag) uniqueness conflict is skipped; other constraint errors still raise
+_SQL_ADD_WALLET_TAG = """
+    INSERT INTO wallet_tags (wallet_address, tag, is_kol)
+    VALUES (?, ?, ?)
+    ON CONFLICT(wallet_address, tag) DO NOTHING
+"""
+
+_SQL_REMOVE_WALLET_TAG = """
+    DELETE FROM wallet_tags
+    WHERE wallet_address = ? AND tag = ?
+"""
+
+_SQL_WALLET_TAGS = """
+    SELECT tag, is_kol FROM wallet_tags
+    WHERE wallet_address = ?
+    ORDER BY created_at DESC
+"""
+
+# Re-registering an address overwrites it in place, keeping its rowid and so its list position
+_SQL_UPSERT_MONITORED_ADDRESS = """
+    INSERT INTO monitored_addresses (
+        address, registered_at, threshold, total_notifications, last_notification, note
+    )
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(address) DO UPDATE SET
+        registered_at = excluded.registered_at,
+        threshold = excluded.threshold,
+        total_notifications = excluded.total_notifications,
+        last_notification = excluded.last_notification,
+        note = excluded.note
+"""
+
+_SQL_DELETE_MONITORED_ADDRESS = "DELETE FROM monitored_addresses WHERE address = ?"
+
+_SQL_MONITORED_ADDRESSES = """
+    SELECT address, registered_at, threshold, total_notifications, last_notification, note
+    FROM monitored_addresses
+    ORDER BY rowid
+"""
+
+# Wallets in at least ? live tokens, as listed by /multi-token-wallets. Each wallet's tokens are
+# aggregated as JSON arrays built from the same rows, so names containing commas survive and
+# the name, address and id lists stay aligned (an unnamed token is listed as null).
+_SQL_MULTI_EARLY_BUYER_WALLETS = """
+    WITH wallet_tokens AS (
+        SELECT
+            tw.wallet_address, t.id, t.token_name, t.token_address,
+            MAX(tw.wallet_balance_usd) as wallet_balance_usd
+        FROM early_buyer_wallets tw
+        JOIN analyzed_tokens t ON tw.token_id = t.id
+        WHERE t.deleted_at IS NULL
+        GROUP BY tw.wallet_address, t.id
+        ORDER BY tw.wallet_address, t.id
+    )
+    SELECT
+        wallet_address,
+        COUNT(*) as token_count,
+        json_group_array(token_name) as token_names,
+        json_group_array(token_address) as token_addresses,
+        json_group_array(id) as token_ids,
+        MAX(wallet_balance_usd) as wallet_balance_usd
+    FROM wallet_tokens
+    GROUP BY wallet_address
+    HAVING COUNT(*) >= ?
+    ORDER BY token_count DESC, wallet_balance_usd DESC
+"""
+
+# Addresses are bound as one JSON array, so the statement text is the same for any batch size
+# and stays in the statement cache (and is not limited by SQLITE_MAX_VARIABLE_NUMBER)
+# Tags come back already grouped per wallet as a JSON array, newest first
+_SQL_MULTI_WALLET_TAGS = """
+    SELECT wallet_address,
+           json_group_array(
+               json_object('tag', tag, 'is_kol', json(CASE WHEN is_kol THEN 'true' ELSE 'false' END))
+           )
+    FROM (
+        SELECT wallet_address, tag, is_kol
+        FROM wallet_tags
+        WHERE wallet_address IN (SELECT value FROM json_each(?))
+        ORDER BY wallet_address, created_at DESC
+    )
+    GROUP BY wallet_address
+"""
+
+_SQL_SEARCH_TOKENS_FTS = """
+    SELECT
+        id, token_address, token_name, token_symbol, acronym,
+        analysis_timestamp, first_buy_timestamp, wallets_found,
+        credits_used, last_analysis_credits
+    FROM analyzed_tokens
+    WHERE id IN (SELECT rowid FROM tokens_fts WHERE tokens_fts MATCH ?)
+       OR id IN (
+           SELECT ebw.token_id
+           FROM wallets_fts
+           JOIN early_buyer_wallets ebw ON ebw.id = wallets_fts.rowid
+           WHERE wallets_fts MATCH ?
+       )
+    ORDER BY analysis_timestamp DESC
+"""
+
+# Fallback for short queries or builds without trigram FTS5. The token fields are
+# concatenated so each row needs one case-folded substring scan instead of four
+# LIKE evaluations, and instr() matches '%' and '_' literally.
+_SQL_SEARCH_TOKENS_SCAN = """
+    WITH token_hits AS (
+        SELECT id FROM analyzed_tokens
+        WHERE instr(
+            lower(token_address || char(31) || IFNULL(token_name, '') || char(31)
+                  || IFNULL(token_symbol, '') || char(31) || IFNULL(acronym, '')),
+            lower(?1)
+        ) > 0
+    )
+    SELECT
+        id, token_address, token_name, token_symbol, acronym,
+        analysis_timestamp, first_buy_timestamp, wallets_found,
+        credits_used, last_analysis_credits
+    FROM analyzed_tokens
+    WHERE id IN token_hits
+       OR id IN (
+           SELECT token_id FROM early_buyer_wallets
+           WHERE instr(lower(wallet_address), lower(?1)) > 0
+       )
+    ORDER BY analysis_timestamp DESC
+"""
+
+
+def _init_search_index(cursor: sqlite3.Cursor):
+    """
+    Create trigram FTS5 indexes used by search_tokens.
+
+    tokens_fts mirrors the searchable analyzed_tokens columns and wallets_fts
+    mirrors early_buyer_wallets.wallet_address. Both are external-content
+    tables kept in sync by triggers, so they only store the index itself.
+    """
+    cursor.execute("SELECT name FROM sqlite_master WHERE name IN ('tokens_fts', 'wallets_fts')")
+    existing = {row[0] for row in cursor.fetchall()}
+
+    cursor.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS tokens_fts USING fts5(
+            token_address, token_name, token_symbol, acronym,
+            content='analyzed_tokens', content_rowid='id', tokenize='trigram'
+        )
+    """
+    )
+
+    cursor.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS wallets_fts USING fts5(
+            wallet_address,
+            content='early_buyer_wallets', content_rowid='id', tokenize='trigram'
+        )
+    """
+    )
+
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS tokens_fts_insert AFTER INSERT ON analyzed_tokens BEGIN
+            INSERT INTO tokens_fts (rowid, token_address, token_name, token_symbol, acronym)
+            VALUES (new.id, new.token_address, new.token_name, new.token_symbol, new.acronym);
+        END
+    """
+    )
+
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS tokens_fts_delete AFTER DELETE ON analyzed_tokens BEGIN
+            INSERT INTO tokens_fts (tokens_fts, rowid, token_address, token_name, token_symbol, acronym)
+            VALUES ('delete', old.id, old.token_address, old.token_name, old.token_symbol, old.acronym);
+        END
+    """
+    )
+
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS tokens_fts_update
+        AFTER UPDATE OF token_address, token_name, token_symbol, acronym ON analyzed_tokens BEGIN
+            INSERT INTO tokens_fts (tokens_fts, rowid, token_address, token_name, token_symbol, acronym)
+            VALUES ('delete', old.id, old.token_address, old.token_name, old.token_symbol, old.acronym);
+            INSERT INTO tokens_fts (rowid, token_address, token_name, token_symbol, acronym)
+            VALUES (new.id, new.token_address, new.token_name, new.token_symbol, new.acronym);
+        END
+    """
+    )
+
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS wallets_fts_insert AFTER INSERT ON early_buyer_wallets BEGIN
+            INSERT INTO wallets_fts (rowid, wallet_address) VALUES (new.id, new.wallet_address);
+        END
+    """
+    )
+
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS wallets_fts_delete AFTER DELETE ON early_buyer_wallets BEGIN
+            INSERT INTO wallets_fts (wallets_fts, rowid, wallet_address) VALUES ('delete', old.id, old.wallet_address);
+        END
+    """
+    )
+
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS wallets_fts_update AFTER UPDATE OF wallet_address ON early_buyer_wallets BEGIN
+            INSERT INTO wallets_fts (wallets_fts, rowid, wallet_address) VALUES ('delete', old.id, old.wallet_address);
+            INSERT INTO wallets_fts (rowid, wallet_address) VALUES (new.id, new.wallet_address);
+        END
+    """
+    )
+
+    # Index rows that existed before the search tables were created
+    if "tokens_fts" not in existing:
+        logger.info("Migrating: Building token search index...")
+        cursor.execute("INSERT INTO tokens_fts (tokens_fts) VALUES ('rebuild')")
+    if "wallets_fts" not in existing:
+        logger.info("Migrating: Building wallet search index...")
+        cursor.execute("INSERT INTO wallets_fts (wallets_fts) VALUES ('rebuild')")
+
+
+def get_schema_version() -> int:
+    """Return the schema version stored in the database header (0 for a new or pre-versioning database)"""
+    with get_db_connection(readonly=True) as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
 
 
 def init_database():
-    """Initialize database schema"""
+    """
+    Initialize database schema and run migrations.
+
+    Skipped entirely when the database is already at SCHEMA_VERSION, so worker
+    processes only pay for a single PRAGMA user_version read on startup.
+    """
+    if get_schema_version() >= SCHEMA_VERSION:
+        return
+
     with get_db_connection() as conn:
         cursor = conn.cursor()
 
+        # Write-ahead logging lets readers proceed while a writer commits.
+        # The journal mode is stored in the database file, so it only needs to be set once.
+        cursor.execute("PRAGMA journal_mode=WAL")
+
+        # Run all DDL and migrations in one transaction so first boot commits (and syncs) once.
+        # IMMEDIATE takes the write lock up front, so a second worker waits instead of migrating concurrently.
+        cursor.execute("BEGIN IMMEDIATE")
+
         # Analyzed tokens table
         cursor.execute(
             """
@@ -306,7 +923,8 @@ def init_database():
                 is_deleted BOOLEAN DEFAULT 0,
                 deleted_at TIMESTAMP,
                 analysis_file_path TEXT,
-                axiom_file_path TEXT
+                axiom_file_path TEXT,
+                unique_wallet_count INTEGER NOT NULL DEFAULT 0
             )
         """
         )
@@ -380,6 +998,20 @@ def init_database():
         """
         )
 
+        # Monitored addresses (watchlist), one row per address
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS monitored_addresses (
+                address TEXT PRIMARY KEY,
+                registered_at TIMESTAMP,
+                threshold INTEGER,
+                total_notifications INTEGER DEFAULT 0,
+                last_notification TIMESTAMP,
+                note TEXT
+            )
+        """
+        )
+
         # Create indices for better query performance
         cursor.execute(
             """
@@ -388,17 +1020,36 @@ def init_database():
         """
         )
 
+        # Multi-token wallet aggregation groups by wallet and counts distinct tokens straight
+        # from this index; it supersedes the plain wallet_address index.
+        cursor.execute("DROP INDEX IF EXISTS idx_wallet_address")
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_ebw_wallet_token
+            ON early_buyer_wallets(wallet_address, token_id)
+        """
+        )
+
+        # Latest known balance per wallet: only rows with a balance, read without the table
         cursor.execute(
             """
-            CREATE INDEX IF NOT EXISTS idx_wallet_address
-            ON early_buyer_wallets(wallet_address)
+            CREATE INDEX IF NOT EXISTS idx_ebw_wallet_run_balance
+            ON early_buyer_wallets(wallet_address, analysis_run_id, wallet_balance_usd)
+            WHERE wallet_balance_usd IS NOT NULL
         """
         )
 
+        # Covering index for get_recent_activity: the top-N scan by timestamp reads every
+        # wallet_activity column from the index and only visits the joined tables.
+        # It supersedes the plain timestamp index.
+        cursor.execute("DROP INDEX IF EXISTS idx_activity_timestamp")
         cursor.execute(
             """
-            CREATE INDEX IF NOT EXISTS idx_activity_timestamp
-            ON wallet_activity(timestamp DESC)
+            CREATE INDEX IF NOT EXISTS idx_activity_timestamp_wallet
+            ON wallet_activity(
+                timestamp DESC, wallet_id, activity_type, sol_amount, token_amount,
+                recipient_address, transaction_signature, description
+            )
         """
         )
 
@@ -417,10 +1068,55 @@ def init_database():
         """
         )
 
+        # Partial indexes for the soft-delete filters: live token ids for the multi-token
+        # aggregation, and the trash listing in deletion order without a sort
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_tokens_live
+            ON analyzed_tokens(id)
+            WHERE is_deleted = 0 OR is_deleted IS NULL
+        """
+        )
+
+        # The token history filters on deleted_at, which the is_deleted partial index can't serve
+        cursor.execute("DROP INDEX IF EXISTS idx_tokens_live_timestamp")
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_tokens_history_timestamp
+            ON analyzed_tokens(analysis_timestamp DESC)
+            WHERE deleted_at IS NULL OR deleted_at = ''
+        """
+        )
+
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_tokens_trash_deleted_at
+            ON analyzed_tokens(deleted_at DESC)
+            WHERE is_deleted = 1
+        """
+        )
+
+        # Superseded by idx_ebw_token_run, which also covers the position ordering
+        cursor.execute("DROP INDEX IF EXISTS idx_token_analysis_run")
+
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_ebw_token_run
+            ON early_buyer_wallets(token_id, analysis_run_id, position)
+        """
+        )
+
         cursor.execute(
             """
-            CREATE INDEX IF NOT EXISTS idx_token_analysis_run
-            ON early_buyer_wallets(token_id, analysis_run_id)
+            CREATE INDEX IF NOT EXISTS idx_ebw_run
+            ON early_buyer_wallets(analysis_run_id, position)
+        """
+        )
+
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_wa_wallet_ts
+            ON wallet_activity(wallet_id, timestamp DESC)
         """
         )
 
@@ -444,19 +1140,19 @@ def init_database():
         ebw_columns = [col[1] for col in cursor.fetchall()]
 
         if "total_usd" not in ebw_columns:
-            print("[Database] Migrating: Adding total_usd column...")
+            logger.info("Migrating: Adding total_usd column...")
             cursor.execute("ALTER TABLE early_buyer_wallets ADD COLUMN total_usd REAL")
 
         if "transaction_count" not in ebw_columns:
-            print("[Database] Migrating: Adding transaction_count column...")
+            logger.info("Migrating: Adding transaction_count column...")
             cursor.execute("ALTER TABLE early_buyer_wallets ADD COLUMN transaction_count INTEGER")
 
         if "average_buy_usd" not in ebw_columns:
-            print("[Database] Migrating: Adding average_buy_usd column...")
+            logger.info("Migrating: Adding average_buy_usd column...")
             cursor.execute("ALTER TABLE early_buyer_wallets ADD COLUMN average_buy_usd REAL")
 
         if "wallet_balance_usd" not in ebw_columns:
-            print("[Database] Migrating: Adding wallet_balance_usd column...")
+            logger.info("Migrating: Adding wallet_balance_usd column...")
             cursor.execute("ALTER TABLE early_buyer_wallets ADD COLUMN wallet_balance_usd REAL")
 
         # Check if credits_used and last_analysis_credits columns exist in analyzed_tokens, if not add them
@@ -464,69 +1160,110 @@ def init_database():
         at_columns = [col[1] for col in cursor.fetchall()]
 
         if "credits_used" not in at_columns:
-            print("[Database] Migrating: Adding credits_used column...")
+            logger.info("Migrating: Adding credits_used column...")
             cursor.execute("ALTER TABLE analyzed_tokens ADD COLUMN credits_used INTEGER DEFAULT 0")
 
         if "last_analysis_credits" not in at_columns:
-            print("[Database] Migrating: Adding last_analysis_credits column...")
+            logger.info("Migrating: Adding last_analysis_credits column...")
             cursor.execute("ALTER TABLE analyzed_tokens ADD COLUMN last_analysis_credits INTEGER DEFAULT 0")
 
+        if "unique_wallet_count" not in at_columns:
+            logger.info("Migrating: Adding unique_wallet_count column...")
+            cursor.execute("ALTER TABLE analyzed_tokens ADD COLUMN unique_wallet_count INTEGER NOT NULL DEFAULT 0")
+            cursor.execute(
+                """
+                UPDATE analyzed_tokens
+                SET unique_wallet_count = (
+                    SELECT COUNT(DISTINCT wallet_address) FROM early_buyer_wallets
+                    WHERE token_id = analyzed_tokens.id
+                )
+            """
+            )
+
+        # Keep unique_wallet_count in step with early_buyer_wallets: a row only counts
+        # when it adds or removes the token's last copy of a wallet
+        cursor.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS ebw_unique_wallet_insert AFTER INSERT ON early_buyer_wallets
+            WHEN NOT EXISTS (
+                SELECT 1 FROM early_buyer_wallets
+                WHERE wallet_address = new.wallet_address AND token_id = new.token_id AND id != new.id
+            )
+            BEGIN
+                UPDATE analyzed_tokens SET unique_wallet_count = unique_wallet_count + 1 WHERE id = new.token_id;
+            END
+        """
+        )
+
+        cursor.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS ebw_unique_wallet_delete AFTER DELETE ON early_buyer_wallets
+            WHEN NOT EXISTS (
+                SELECT 1 FROM early_buyer_wallets
+                WHERE wallet_address = old.wallet_address AND token_id = old.token_id
+            )
+            BEGIN
+                UPDATE analyzed_tokens SET unique_wallet_count = unique_wallet_count - 1 WHERE id = old.token_id;
+            END
+        """
+        )
+
         # Migration for analysis_run_id column in early_buyer_wallets
         if "analysis_run_id" not in ebw_columns:
-            print("[Database] Migrating: Adding analysis_run_id column to early_buyer_wallets...")
-            print("[Database] Warning: Existing wallet records will be linked to a default analysis run")
+            logger.info("Migrating: Adding analysis_run_id column to early_buyer_wallets...")
+            logger.warning("Existing wallet records will be linked to a default analysis run")
 
             # Add the column (allowing NULL temporarily for migration)
             cursor.execute("ALTER TABLE early_buyer_wallets ADD COLUMN analysis_run_id INTEGER")
 
-            # For each existing token, create an analysis_run entry
-            cursor.execute("SELECT DISTINCT token_id FROM early_buyer_wallets WHERE analysis_run_id IS NULL")
-            token_ids = cursor.fetchall()
+            # Create one analysis run per existing token that has unlinked wallets
+            cursor.execute(
+                """
+                INSERT INTO analysis_runs (token_id, analysis_timestamp, wallets_found, credits_used)
+                SELECT id, analysis_timestamp, COALESCE(wallets_found, 0), COALESCE(last_analysis_credits, 0)
+                FROM analyzed_tokens
+                WHERE id IN (SELECT DISTINCT token_id FROM early_buyer_wallets WHERE analysis_run_id IS NULL)
+            """
+            )
 
-            for row in token_ids:
-                token_id = row[0]
-                # Get the token's analysis timestamp
-                cursor.execute(
-                    "SELECT analysis_timestamp, wallets_found, last_analysis_credits FROM analyzed_tokens WHERE id = ?",
-                    (token_id,),
+            # Link all existing wallets to their token's newly created analysis run
+            cursor.execute(
+                """
+                UPDATE early_buyer_wallets
+                SET analysis_run_id = (
+                    SELECT ar.id FROM analysis_runs ar
+                    WHERE ar.token_id = early_buyer_wallets.token_id
+                    ORDER BY ar.id DESC
+                    LIMIT 1
                 )
-                token_data = cursor.fetchone()
-
-                if token_data:
-                    analysis_timestamp, wallets_found, credits = token_data[0], token_data[1], token_data[2]
-
-                    # Create an analysis run for this token
-                    cursor.execute(
-                        """
-                        INSERT INTO analysis_runs (token_id, analysis_timestamp, wallets_found, credits_used)
-                        VALUES (?, ?, ?, ?)
-                    """,
-                        (token_id, analysis_timestamp, wallets_found or 0, credits or 0),
-                    )
-
-                    analysis_run_id = cursor.lastrowid
-
-                    # Link all existing wallets for this token to this analysis run
-                    cursor.execute(
-                        """
-                        UPDATE early_buyer_wallets
-                        SET analysis_run_id = ?
-                        WHERE token_id = ? AND analysis_run_id IS NULL
-                    """,
-                        (analysis_run_id, token_id),
-                    )
-
-            print("[Database] Migration complete: Existing wallets linked to analysis runs")
+                WHERE analysis_run_id IS NULL
+            """
+            )
+
+            logger.info("Migration complete: Existing wallets linked to analysis runs")
 
         # Migration for is_kol column in wallet_tags
         cursor.execute("PRAGMA table_info(wallet_tags)")
         wt_columns = [col[1] for col in cursor.fetchall()]
 
         if "is_kol" not in wt_columns:
-            print("[Database] Migrating: Adding is_kol column to wallet_tags...")
+            logger.info("Migrating: Adding is_kol column to wallet_tags...")
             cursor.execute("ALTER TABLE wallet_tags ADD COLUMN is_kol BOOLEAN DEFAULT 0")
 
-        print("[Database] Schema initialized successfully")
+        if FTS_ENABLED:
+            _init_search_index(cursor)
+
+        # Gather planner statistics once; afterwards PRAGMA optimize keeps them fresh
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        if not cursor.fetchone():
+            cursor.execute("ANALYZE")
+
+        # Record the schema version in the database header so subsequent startups can skip this function.
+        # Versions used to live in a meta table, which is no longer needed.
+        cursor.execute("DROP TABLE IF EXISTS meta")
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+        logger.info("Schema initialized successfully")
 
 
 def save_analyzed_token(
@@ -556,27 +1293,33 @@ def save_analyzed_token(
     Returns:
         token_id: Database ID of the saved token
     """
+    # Serialize the export and build the wallet rows before taking the write lock;
+    # only the ids are added inside the transaction
+    axiom_blob = orjson.dumps(axiom_json)
+    wallets = []
+    for index, bidder in enumerate(early_bidders[:max_wallets], start=1):
+        total_usd = bidder.get("total_usd", 0)
+        first_buy_usd = round(total_usd)
+        wallets.append(
+            (
+                bidder["wallet_address"],
+                index,
+                first_buy_usd,
+                total_usd,
+                bidder.get("transaction_count", 1),
+                bidder.get("average_buy_usd", total_usd),
+                bidder.get("first_buy_time"),
+                f"({index}/{max_wallets})${first_buy_usd}|{acronym}",
+                bidder.get("wallet_balance_usd"),
+            )
+        )
+
     with get_db_connection() as conn:
-        cursor = conn.cursor()
+        cursor = _plain_cursor(conn)
 
         # Insert or update analyzed token
         cursor.execute(
-            """
-            INSERT INTO analyzed_tokens (
-                token_address, token_name, token_symbol, acronym,
-                first_buy_timestamp, wallets_found, axiom_json, credits_used, last_analysis_credits
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(token_address) DO UPDATE SET
-                token_name = excluded.token_name,
-                token_symbol = excluded.token_symbol,
-                acronym = excluded.acronym,
-                analysis_timestamp = CURRENT_TIMESTAMP,
-                first_buy_timestamp = excluded.first_buy_timestamp,
-                wallets_found = excluded.wallets_found,
-                axiom_json = excluded.axiom_json,
-                credits_used = analyzed_tokens.credits_used + excluded.credits_used,
-                last_analysis_credits = excluded.last_analysis_credits
-        """,
+            _SQL_UPSERT_TOKEN,
             (
                 token_address,
                 token_name,
@@ -584,175 +1327,143 @@ def save_analyzed_token(
                 acronym,
                 first_buy_timestamp,
                 len(early_bidders),
-                json.dumps(axiom_json),
+                axiom_blob,
                 credits_used,
                 credits_used,
             ),
         )
 
         # Get the token ID
-        cursor.execute("SELECT id FROM analyzed_tokens WHERE token_address = ?", (token_address,))
-        token_id = cursor.fetchone()["id"]
+        if not UPSERT_RETURNING_ID:
+            cursor.execute("SELECT id FROM analyzed_tokens WHERE token_address = ?", (token_address,))
+        token_id = cursor.fetchone()[0]
 
         # Create a new analysis run entry for this analysis
-        cursor.execute(
-            """
-            INSERT INTO analysis_runs (token_id, wallets_found, credits_used)
-            VALUES (?, ?, ?)
-        """,
-            (token_id, len(early_bidders), credits_used),
-        )
+        cursor.execute(_SQL_INSERT_ANALYSIS_RUN, (token_id, len(early_bidders), credits_used))
 
         analysis_run_id = cursor.lastrowid
-        print(f"[Database] Created analysis run #{analysis_run_id} for token {acronym}")
+        logger.debug("Created analysis run #%s for token %s", analysis_run_id, acronym)
 
         # Insert early buyer wallets linked to this analysis run
         # Use INSERT OR IGNORE to skip wallets that already exist (UNIQUE constraint on token_id + wallet_address)
         # This avoids wasteful DELETE operations since earliest buyers never change (immutable blockchain data)
-        inserted_count = 0
-        skipped_count = 0
-
-        for index, bidder in enumerate(early_bidders[:max_wallets], start=1):
-            total_usd = bidder.get("total_usd", 0)
-            first_buy_usd = round(total_usd)
-            transaction_count = bidder.get("transaction_count", 1)
-            average_buy_usd = bidder.get("average_buy_usd", total_usd)
-            wallet_balance_usd = bidder.get("wallet_balance_usd")
-            axiom_name = f"({index}/{max_wallets})${first_buy_usd}|{acronym}"
+        rows = [(token_id, analysis_run_id) + wallet for wallet in wallets]
 
-            cursor.execute(
-                """
-                INSERT OR IGNORE INTO early_buyer_wallets (
-                    token_id, analysis_run_id, wallet_address, position, first_buy_usd,
-                    total_usd, transaction_count, average_buy_usd,
-                    first_buy_timestamp, axiom_name, wallet_balance_usd
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    token_id,
-                    analysis_run_id,
-                    bidder["wallet_address"],
-                    index,
-                    first_buy_usd,
-                    total_usd,
-                    transaction_count,
-                    average_buy_usd,
-                    bidder.get("first_buy_time"),
-                    axiom_name,
-                    wallet_balance_usd,
-                ),
-            )
+        # Single prepared statement bound once per row
+        cursor.executemany(_SQL_INSERT_EARLY_BUYER, rows)
 
-            # Track if this was a new insert or ignored duplicate
-            if cursor.rowcount > 0:
-                inserted_count += 1
-            else:
-                skipped_count += 1
+        # rowcount is the total number of rows inserted; ignored duplicates are not counted.
+        # A conn.total_changes delta would also include the rows the wallets_fts triggers write.
+        inserted_count = max(cursor.rowcount, 0)
+        skipped_count = len(rows) - inserted_count
 
         if skipped_count > 0:
-            print(
-                f"[Database] Saved token {acronym}: {inserted_count} new wallets, {skipped_count} already existed (run #{analysis_run_id})"
+            logger.debug(
+                "Saved token %s: %s new wallets, %s already existed (run #%s)",
+                acronym,
+                inserted_count,
+                skipped_count,
+                analysis_run_id,
             )
         else:
-            print(f"[Database] Saved token {acronym} with {inserted_count} wallets (run #{analysis_run_id})")
+            logger.debug("Saved token %s with %s wallets (run #%s)", acronym, inserted_count, analysis_run_id)
         return token_id
 
 
 def get_analyzed_tokens(limit: int = 50, include_deleted: bool = False) -> List[Dict]:
     """Get list of analyzed tokens, most recent first"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
+    with get_db_connection(readonly=True) as conn:
+        cursor = _plain_cursor(conn)
+        cursor.execute(_SQL_ANALYZED_TOKENS_WITH_DELETED if include_deleted else _SQL_ANALYZED_TOKENS, (limit,))
 
-        if include_deleted:
-            cursor.execute(
-                """
-                SELECT
-                    id, token_address, token_name, token_symbol, acronym,
-                    analysis_timestamp, first_buy_timestamp, wallets_found, credits_used, last_analysis_credits,
-                    is_deleted, deleted_at
-                FROM analyzed_tokens
-                ORDER BY analysis_timestamp DESC
-                LIMIT ?
-            """,
-                (limit,),
-            )
-        else:
-            cursor.execute(
-                """
-                SELECT
-                    id, token_address, token_name, token_symbol, acronym,
-                    analysis_timestamp, first_buy_timestamp, wallets_found, credits_used, last_analysis_credits,
-                    is_deleted, deleted_at
-                FROM analyzed_tokens
-                WHERE is_deleted = 0 OR is_deleted IS NULL
-                ORDER BY analysis_timestamp DESC
-                LIMIT ?
-            """,
-                (limit,),
-            )
+        # Every column but the trailing wallet_address belongs to the token
+        token_columns = [column[0] for column in cursor.description[:-1]]
 
         tokens = []
-        for row in cursor.fetchall():
-            token_dict = dict(row)
+        for _, rows in groupby(cursor, key=lambda row: row[0]):
+            rows = list(rows)
+            token_dict = dict(zip(token_columns, rows[0]))
+            # A token without wallets yields a single row with a NULL wallet_address
+            token_dict["wallet_addresses"] = [row[-1] for row in rows if row[-1] is not None]
+            tokens.append(token_dict)
 
-            # Get wallet addresses for this token (from most recent analysis)
-            cursor.execute(
-                """
-                SELECT DISTINCT ebw.wallet_address
-                FROM early_buyer_wallets ebw
-                JOIN analysis_runs ar ON ebw.analysis_run_id = ar.id
-                WHERE ebw.token_id = ?
-                ORDER BY ar.analysis_timestamp DESC
-                LIMIT 10
-            """,
-                (token_dict["id"],),
-            )
+        return tokens
 
-            wallet_addresses = [row[0] for row in cursor.fetchall()]
-            token_dict["wallet_addresses"] = wallet_addresses
 
-            tokens.append(token_dict)
+def get_tokens_history() -> List[Dict]:
+    """Get every non-deleted token with its distinct early buyer count across runs, most recent first"""
+    with get_db_connection(readonly=True) as conn:
+        cursor = _plain_cursor(conn)
+        cursor.execute(_SQL_TOKENS_HISTORY)
+        return _rows_as_dicts(cursor)
 
-        return tokens
 
+def get_tokens_trash() -> List[Dict]:
+    """Get every token with a deleted_at timestamp, most recently deleted first"""
+    with get_db_connection(readonly=True) as conn:
+        cursor = _plain_cursor(conn)
+        cursor.execute(_SQL_TOKENS_TRASH)
+        return _rows_as_dicts(cursor)
 
-def get_token_details(token_id: int) -> Optional[Dict]:
-    """Get detailed information about a specific analyzed token"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
+
+def get_token_details(token_id: int, include_axiom_json: bool = True, all_runs: bool = False) -> Optional[Dict]:
+    """
+    Get detailed information about a specific analyzed token
+
+    Args:
+        token_id: Token ID
+        include_axiom_json: Also load and decode the Axiom export (see load_axiom_json)
+        all_runs: List the wallets of every run in first-buy order instead of the latest run's
+    """
+    with get_db_connection(readonly=True) as conn:
+        cursor = _plain_cursor(conn)
 
         # Get token info
-        cursor.execute(
-            """
-            SELECT * FROM analyzed_tokens WHERE id = ?
-        """,
-            (token_id,),
-        )
+        cursor.execute(_SQL_TOKEN_DETAILS, (token_id,))
 
-        token = cursor.fetchone()
-        if not token:
+        tokens = _rows_as_dicts(cursor)
+        if not tokens:
             return None
 
-        token_dict = dict(token)
+        token_dict = tokens[0]
 
-        # Parse axiom_json back to list
-        if token_dict.get("axiom_json"):
-            token_dict["axiom_json"] = json.loads(token_dict["axiom_json"])
+        # Get associated wallets from the most recent analysis run, or from all of them
+        cursor.execute(_SQL_TOKEN_ALL_WALLETS if all_runs else _SQL_TOKEN_WALLETS, (token_id,))
 
-        # Get associated wallets from the most recent analysis run
-        cursor.execute(
-            """
-            SELECT ebw.* FROM early_buyer_wallets ebw
-            JOIN analysis_runs ar ON ebw.analysis_run_id = ar.id
-            WHERE ebw.token_id = ?
-            ORDER BY ar.analysis_timestamp DESC, ebw.position ASC
-        """,
-            (token_id,),
-        )
+        token_dict["wallets"] = _rows_as_dicts(cursor)
 
-        token_dict["wallets"] = [dict(row) for row in cursor.fetchall()]
+    if include_axiom_json:
+        token_dict["axiom_json"] = load_axiom_json(token_id)
+    return token_dict
 
-        return token_dict
+
+def load_axiom_json(token_id: int) -> Optional[list]:
+    """
+    Load and decode a token's Axiom export.
+
+    Args:
+        token_id: Token ID
+
+    Returns:
+        Decoded export, or None if the token has none
+    """
+    with get_db_connection(readonly=True) as conn:
+        cursor = _plain_cursor(conn)
+        cursor.execute(_SQL_TOKEN_AXIOM_JSON, (token_id,))
+        row = cursor.fetchone()
+
+    # BLOB for new rows, TEXT for older ones
+    if not row or not row[0]:
+        return None
+    return orjson.loads(row[0])
+
+
+def token_exists(token_id: int) -> bool:
+    """Check whether a token row exists, deleted or not"""
+    with get_db_connection(readonly=True) as conn:
+        cursor = _plain_cursor(conn)
+        cursor.execute("SELECT 1 FROM analyzed_tokens WHERE id = ?", (token_id,))
+        return cursor.fetchone() is not None
 
 
 def get_token_analysis_history(token_id: int) -> List[Dict]:
@@ -760,55 +1471,39 @@ def get_token_analysis_history(token_id: int) -> List[Dict]:
     Get all analysis runs for a token, most recent first.
     Each run includes its wallets.
     """
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
+    with get_db_connection(readonly=True) as conn:
+        cursor = _plain_cursor(conn)
 
-        # Get all analysis runs for this token
-        cursor.execute(
-            """
-            SELECT id, analysis_timestamp, wallets_found, credits_used
-            FROM analysis_runs
-            WHERE token_id = ?
-            ORDER BY analysis_timestamp DESC
-        """,
-            (token_id,),
-        )
+        # Fetch all runs and their wallets in one query, ordered so each run's rows are contiguous
+        cursor.execute(_SQL_TOKEN_ANALYSIS_HISTORY, (token_id,))
 
-        runs = []
-        for run_row in cursor.fetchall():
-            run_dict = dict(run_row)
+        wallet_columns = [column[0] for column in cursor.description[4:]]
 
-            # Get wallets for this specific run
-            cursor.execute(
-                """
-                SELECT * FROM early_buyer_wallets
-                WHERE analysis_run_id = ?
-                ORDER BY position ASC
-            """,
-                (run_dict["id"],),
+        runs = []
+        for run_id, rows in groupby(cursor, key=lambda row: row[0]):
+            rows = list(rows)
+            _, analysis_timestamp, wallets_found, credits_used = rows[0][:4]
+            runs.append(
+                {
+                    "id": run_id,
+                    "analysis_timestamp": analysis_timestamp,
+                    "wallets_found": wallets_found,
+                    "credits_used": credits_used,
+                    # A run without wallets yields a single row of NULL wallet columns
+                    "wallets": [dict(zip(wallet_columns, row[4:])) for row in rows if row[4] is not None],
+                }
             )
 
-            run_dict["wallets"] = [dict(w) for w in cursor.fetchall()]
-            runs.append(run_dict)
-
         return runs
 
 
 def get_wallet_activity(wallet_id: int, limit: int = 50) -> List[Dict]:
     """Get activity history for a specific wallet"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT * FROM wallet_activity
-            WHERE wallet_id = ?
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """,
-            (wallet_id, limit),
-        )
+    with get_db_connection(readonly=True) as conn:
+        cursor = _plain_cursor(conn)
+        cursor.execute(_SQL_WALLET_ACTIVITY, (wallet_id, limit))
 
-        return [dict(row) for row in cursor.fetchall()]
+        return _rows_as_dicts(cursor)
 
 
 def save_wallet_activity(
@@ -824,72 +1519,62 @@ def save_wallet_activity(
     """Save a wallet activity event"""
     with get_db_connection() as conn:
         cursor = conn.cursor()
-
-        # Find wallet_id
         cursor.execute(
-            """
-            SELECT id FROM early_buyer_wallets
-            WHERE wallet_address = ?
-            LIMIT 1
-        """,
-            (wallet_address,),
+            _SQL_INSERT_WALLET_ACTIVITY,
+            (
+                transaction_signature,
+                timestamp,
+                activity_type,
+                description,
+                sol_amount,
+                token_amount,
+                recipient_address,
+                wallet_address,
+            ),
         )
+        return cursor.rowcount == 1
 
-        wallet = cursor.fetchone()
-        if not wallet:
-            return False  # Wallet not being tracked
 
-        wallet_id = wallet["id"]
+def save_wallet_activities(events: List[Dict]) -> int:
+    """
+    Save a batch of wallet activity events in a single transaction.
 
-        # Insert activity (ignore duplicates)
-        try:
-            cursor.execute(
-                """
-                INSERT INTO wallet_activity (
-                    wallet_id, transaction_signature, timestamp,
-                    activity_type, description, sol_amount,
-                    token_amount, recipient_address
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    wallet_id,
-                    transaction_signature,
-                    timestamp,
-                    activity_type,
-                    description,
-                    sol_amount,
-                    token_amount,
-                    recipient_address,
-                ),
-            )
-            return True
-        except sqlite3.IntegrityError:
-            # Duplicate transaction signature
-            return False
+    Args:
+        events: Dicts with the same keys as save_wallet_activity's arguments
 
+    Returns:
+        Number of events inserted (untracked wallets and duplicates are skipped)
+    """
+    if not events:
+        return 0
+
+    rows = [
+        (
+            event["transaction_signature"],
+            event["timestamp"],
+            event["activity_type"],
+            event["description"],
+            event.get("sol_amount", 0.0),
+            event.get("token_amount", 0.0),
+            event.get("recipient_address"),
+            event["wallet_address"],
+        )
+        for event in events
+    ]
 
-def get_recent_activity(limit: int = 100) -> List[Dict]:
-    """Get recent wallet activity across all tracked wallets"""
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT
-                wa.*,
-                ebw.wallet_address,
-                ebw.axiom_name,
-                at.token_name,
-                at.acronym
-            FROM wallet_activity wa
-            JOIN early_buyer_wallets ebw ON wa.wallet_id = ebw.id
-            JOIN analyzed_tokens at ON ebw.token_id = at.id
-            ORDER BY wa.timestamp DESC
-            LIMIT ?
-        """,
-            (limit,),
-        )
+        cursor.executemany(_SQL_INSERT_WALLET_ACTIVITY, rows)
+        return max(cursor.rowcount, 0)
+
+
+def get_recent_activity(limit: int = 100) -> List[Dict]:
+    """Get recent wallet activity across all tracked wallets"""
+    with get_db_connection(readonly=True) as conn:
+        cursor = _plain_cursor(conn)
+        cursor.execute(_SQL_RECENT_ACTIVITY, (limit,))
 
-        return [dict(row) for row in cursor.fetchall()]
+        return _rows_as_dicts(cursor)
 
 
 def delete_analyzed_token(token_id: int) -> bool:
@@ -918,7 +1603,7 @@ def delete_analyzed_token(token_id: int) -> bool:
         # Delete token (CASCADE will delete wallets and activity)
         cursor.execute("DELETE FROM analyzed_tokens WHERE id = ?", (token_id,))
 
-        print(f"[Database] Deleted token ID {token_id} and all associated data")
+        logger.debug("Deleted token ID %s and all associated data", token_id)
         return True
 
 
@@ -927,38 +1612,46 @@ def search_tokens(query: str) -> List[Dict]:
     Search tokens by token address, token name, symbol, acronym, or wallet address.
     Returns list of tokens that match the search (case-insensitive).
     """
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
+    with get_db_connection(readonly=True) as conn:
+        cursor = _plain_cursor(conn)
 
-        search_pattern = f"%{query}%"
+        if FTS_ENABLED and len(query) >= FTS_MIN_QUERY_LENGTH:
+            # Quote the query as a single FTS phrase so it is matched as a literal substring
+            phrase = '"' + query.replace('"', '""') + '"'
+            cursor.execute(_SQL_SEARCH_TOKENS_FTS, (phrase, phrase))
+            return _rows_as_dicts(cursor)
 
-        # Search by token fields OR tokens that have matching wallets
-        cursor.execute(
-            """
-            SELECT DISTINCT
-                at.id, at.token_address, at.token_name, at.token_symbol, at.acronym,
-                at.analysis_timestamp, at.first_buy_timestamp, at.wallets_found,
-                at.credits_used, at.last_analysis_credits
-            FROM analyzed_tokens at
-            WHERE at.token_address LIKE ? COLLATE NOCASE
-               OR at.token_name LIKE ? COLLATE NOCASE
-               OR at.token_symbol LIKE ? COLLATE NOCASE
-               OR at.acronym LIKE ? COLLATE NOCASE
-               OR at.id IN (
-                   SELECT DISTINCT token_id
-                   FROM early_buyer_wallets
-                   WHERE wallet_address LIKE ? COLLATE NOCASE
-               )
-            ORDER BY at.analysis_timestamp DESC
-        """,
-            (search_pattern, search_pattern, search_pattern, search_pattern, search_pattern),
-        )
+        cursor.execute(_SQL_SEARCH_TOKENS_SCAN, (query,))
+        return _rows_as_dicts(cursor)
 
-        tokens = []
-        for row in cursor.fetchall():
-            tokens.append(dict(row))
 
-        return tokens
+def get_multi_early_buyer_wallets(min_tokens: int = 2) -> List[Dict]:
+    """
+    Find wallets that appear in multiple live tokens, for the /multi-token-wallets listing.
+    Token names are listed bare and the balance is the highest one recorded.
+
+    Args:
+        min_tokens: Minimum number of tokens a wallet must appear in (default: 2)
+
+    Returns:
+        List of dicts with wallet_address, token_count, token_names, token_addresses,
+        token_ids and wallet_balance_usd, most widespread wallets first
+    """
+    with get_db_connection(readonly=True) as conn:
+        cursor = _plain_cursor(conn)
+        cursor.execute(_SQL_MULTI_EARLY_BUYER_WALLETS, (min_tokens,))
+
+        return [
+            {
+                "wallet_address": wallet_address,
+                "token_count": token_count,
+                "token_names": orjson.loads(token_names),
+                "token_addresses": orjson.loads(token_addresses),
+                "token_ids": orjson.loads(token_ids),
+                "wallet_balance_usd": wallet_balance_usd,
+            }
+            for wallet_address, token_count, token_names, token_addresses, token_ids, wallet_balance_usd in cursor
+        ]
 
 
 def get_multi_token_wallets(min_tokens: int = 2) -> List[Dict]:
@@ -972,54 +1665,66 @@ def get_multi_token_wallets(min_tokens: int = 2) -> List[Dict]:
     Returns:
         List of dicts with wallet_address, token_count, and list of tokens
     """
-    with get_db_connection() as conn:
+    with get_db_connection(readonly=True) as conn:
         cursor = conn.cursor()
 
-        # Find wallets that appear in multiple tokens
-        # OPTIMIZED: Use CTE with window function instead of correlated subquery
+        # Find wallets that appear in multiple tokens, with their latest known balance.
+        # Tokens are aggregated per wallet with json_group_array so names containing
+        # commas survive and the whole result decodes in one orjson pass.
         cursor.execute(
             """
             WITH latest_balances AS (
+                -- With a single MAX(), SQLite takes the bare columns from the row holding the max,
+                -- giving exactly one row per wallet without materializing a window
                 SELECT
                     ebw.wallet_address,
                     ebw.wallet_balance_usd,
-                    ar.analysis_timestamp,
-                    ROW_NUMBER() OVER (
-                        PARTITION BY ebw.wallet_address
-                        ORDER BY ar.analysis_timestamp DESC
-                    ) as rn
+                    MAX(ar.analysis_timestamp) as analysis_timestamp
                 FROM early_buyer_wallets ebw
                 JOIN analysis_runs ar ON ebw.analysis_run_id = ar.id
                 WHERE ebw.wallet_balance_usd IS NOT NULL
+                GROUP BY ebw.wallet_address
+            ),
+            wallet_tokens AS (
+                SELECT DISTINCT ebw.wallet_address, at.id, at.token_name, at.token_symbol, at.token_address
+                FROM early_buyer_wallets ebw
+                JOIN analyzed_tokens at ON ebw.token_id = at.id
+                WHERE (at.is_deleted = 0 OR at.is_deleted IS NULL)
+                ORDER BY ebw.wallet_address, at.id
             )
             SELECT
-                ebw.wallet_address,
-                COUNT(DISTINCT ebw.token_id) as token_count,
-                GROUP_CONCAT(DISTINCT at.token_name || ' (' || at.token_symbol || ')') as token_names,
-                GROUP_CONCAT(DISTINCT at.token_address) as token_addresses,
-                GROUP_CONCAT(DISTINCT ebw.token_id) as token_ids,
+                wt.wallet_address,
+                COUNT(*) as token_count,
+                json_group_array(
+                    json_object('id', wt.id, 'name', wt.token_name, 'symbol', wt.token_symbol,
+                                'address', wt.token_address)
+                ) as tokens_json,
                 lb.wallet_balance_usd
-            FROM early_buyer_wallets ebw
-            JOIN analyzed_tokens at ON ebw.token_id = at.id
-            LEFT JOIN latest_balances lb ON lb.wallet_address = ebw.wallet_address AND lb.rn = 1
-            WHERE (at.is_deleted = 0 OR at.is_deleted IS NULL)
-            GROUP BY ebw.wallet_address
-            HAVING COUNT(DISTINCT ebw.token_id) >= ?
-            ORDER BY token_count DESC, ebw.wallet_address
+            FROM wallet_tokens wt
+            LEFT JOIN latest_balances lb ON lb.wallet_address = wt.wallet_address
+            GROUP BY wt.wallet_address
+            HAVING COUNT(*) >= ?
+            ORDER BY token_count DESC, wt.wallet_address
         """,
             (min_tokens,),
         )
 
         wallets = []
-        for row in cursor.fetchall():
+        for wallet_address, token_count, tokens_json, wallet_balance_usd in cursor:
+            # Aggregate order is not guaranteed before SQLite 3.44, so sort by id here
+            tokens = sorted(orjson.loads(tokens_json), key=lambda token: token["id"])
             wallets.append(
                 {
-                    "wallet_address": row[0],
-                    "token_count": row[1],
-                    "token_names": row[2].split(",") if row[2] else [],
-                    "token_addresses": row[3].split(",") if row[3] else [],
-                    "token_ids": [int(x) for x in row[4].split(",")] if row[4] else [],
-                    "wallet_balance_usd": row[5],
+                    "wallet_address": wallet_address,
+                    "token_count": token_count,
+                    "token_names": [
+                        f"{token['name']} ({token['symbol']})"
+                        for token in tokens
+                        if token["name"] is not None and token["symbol"] is not None
+                    ],
+                    "token_addresses": [token["address"] for token in tokens],
+                    "token_ids": [token["id"] for token in tokens],
+                    "wallet_balance_usd": wallet_balance_usd,
                 }
             )
 
@@ -1037,30 +1742,36 @@ def update_wallet_balance(wallet_address: str, balance_usd: float) -> bool:
     Returns:
         True if at least one row was updated, False otherwise
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     try:
-        # Update balance in early_buyer_wallets table
-        cursor.execute(
-            """
-            UPDATE early_buyer_wallets
-            SET wallet_balance_usd = ?
-            WHERE wallet_address = ?
-        """,
-            (balance_usd, wallet_address),
-        )
-
-        rows_updated = cursor.getrowcount()
-        conn.commit()
-        return rows_updated > 0
-
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # Update balance in early_buyer_wallets table
+            cursor.execute(_SQL_UPDATE_WALLET_BALANCE, (balance_usd, wallet_address))
+            return cursor.rowcount > 0
     except Exception as e:
-        print(f"Error updating wallet balance for {wallet_address}: {e}")
-        conn.rollback()
+        logger.error("Error updating wallet balance for %s: %s", wallet_address, e)
         return False
-    finally:
-        conn.close()
+
+
+def update_wallet_balances(balances: List[Tuple[str, float]]) -> int:
+    """
+    Update wallet balances for many wallet addresses in a single transaction.
+
+    Args:
+        balances: (wallet_address, balance_usd) pairs
+
+    Returns:
+        Total number of wallet rows updated
+    """
+    if not balances:
+        return 0
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            _SQL_UPDATE_WALLET_BALANCE, [(balance_usd, wallet_address) for wallet_address, balance_usd in balances]
+        )
+        return max(cursor.rowcount, 0)
 
 
 def add_wallet_tag(wallet_address: str, tag: str, is_kol: bool = False) -> bool:
@@ -1077,18 +1788,30 @@ def add_wallet_tag(wallet_address: str, tag: str, is_kol: bool = False) -> bool:
     """
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        try:
-            cursor.execute(
-                """
-                INSERT INTO wallet_tags (wallet_address, tag, is_kol)
-                VALUES (?, ?, ?)
-            """,
-                (wallet_address, tag, 1 if is_kol else 0),
-            )
-            return True
-        except sqlite3.IntegrityError:
-            # Tag already exists for this wallet
-            return False
+        cursor.execute(_SQL_ADD_WALLET_TAG, (wallet_address, tag, 1 if is_kol else 0))
+        # rowcount is 0 when the tag already exists for this wallet
+        return cursor.rowcount == 1
+
+
+def add_wallet_tags_bulk(tags: List[Tuple[str, str, bool]]) -> int:
+    """
+    Add many wallet tags in a single transaction.
+
+    Args:
+        tags: (wallet_address, tag, is_kol) triples
+
+    Returns:
+        Number of tags added; tags a wallet already had are skipped
+    """
+    if not tags:
+        return 0
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            _SQL_ADD_WALLET_TAG, [(wallet_address, tag, 1 if is_kol else 0) for wallet_address, tag, is_kol in tags]
+        )
+        return max(cursor.rowcount, 0)
 
 
 def remove_wallet_tag(wallet_address: str, tag: str) -> bool:
@@ -1104,13 +1827,7 @@ def remove_wallet_tag(wallet_address: str, tag: str) -> bool:
     """
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute(
-            """
-            DELETE FROM wallet_tags
-            WHERE wallet_address = ? AND tag = ?
-        """,
-            (wallet_address, tag),
-        )
+        cursor.execute(_SQL_REMOVE_WALLET_TAG, (wallet_address, tag))
         return cursor.rowcount > 0
 
 
@@ -1124,17 +1841,10 @@ def get_wallet_tags(wallet_address: str) -> List[Dict]:
     Returns:
         List of tag dictionaries with 'tag' and 'is_kol' fields
     """
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT tag, is_kol FROM wallet_tags
-            WHERE wallet_address = ?
-            ORDER BY created_at DESC
-        """,
-            (wallet_address,),
-        )
-        return [{"tag": row[0], "is_kol": bool(row[1])} for row in cursor.fetchall()]
+    with get_db_connection(readonly=True) as conn:
+        cursor = _plain_cursor(conn)
+        cursor.execute(_SQL_WALLET_TAGS, (wallet_address,))
+        return [{"tag": row[0], "is_kol": bool(row[1])} for row in cursor]
 
 
 def get_multi_wallet_tags(wallet_addresses: List[str]) -> Dict[str, List[Dict]]:
@@ -1153,28 +1863,15 @@ def get_multi_wallet_tags(wallet_addresses: List[str]) -> Dict[str, List[Dict]]:
     if not wallet_addresses:
         return {}
 
-    with get_db_connection() as conn:
+    with get_db_connection(readonly=True) as conn:
         cursor = conn.cursor()
 
-        # Create placeholders for IN clause
-        placeholders = ",".join("?" * len(wallet_addresses))
-
         # Single query fetches all tags for all wallets
-        cursor.execute(
-            f"""
-            SELECT wallet_address, tag, is_kol
-            FROM wallet_tags
-            WHERE wallet_address IN ({placeholders})
-            ORDER BY wallet_address, created_at DESC
-        """,
-            wallet_addresses,
-        )
+        cursor.execute(_SQL_MULTI_WALLET_TAGS, (orjson.dumps(wallet_addresses),))
 
-        # Group results by wallet address
         result = {addr: [] for addr in wallet_addresses}
-        for row in cursor.fetchall():
-            wallet_addr, tag, is_kol = row
-            result[wallet_addr].append({"tag": tag, "is_kol": bool(is_kol)})
+        for wallet_addr, tags_json in cursor:
+            result[wallet_addr] = orjson.loads(tags_json)
 
         return result
 
@@ -1186,7 +1883,7 @@ def get_all_tags() -> List[str]:
     Returns:
         List of unique tag strings
     """
-    with get_db_connection() as conn:
+    with get_db_connection(readonly=True) as conn:
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -1194,7 +1891,7 @@ def get_all_tags() -> List[str]:
             ORDER BY tag
         """
         )
-        return [row[0] for row in cursor.fetchall()]
+        return [row[0] for row in cursor]
 
 
 def get_wallets_by_tag(tag: str) -> List[str]:
@@ -1207,7 +1904,7 @@ def get_wallets_by_tag(tag: str) -> List[str]:
     Returns:
         List of wallet addresses
     """
-    with get_db_connection() as conn:
+    with get_db_connection(readonly=True) as conn:
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -1217,7 +1914,7 @@ def get_wallets_by_tag(tag: str) -> List[str]:
         """,
             (tag,),
         )
-        return [row[0] for row in cursor.fetchall()]
+        return [row[0] for row in cursor]
 
 
 def get_all_tagged_wallets() -> List[Dict]:
@@ -1227,20 +1924,28 @@ def get_all_tagged_wallets() -> List[Dict]:
     Returns:
         List of dictionaries with wallet_address and tags
     """
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
+    with get_db_connection(readonly=True) as conn:
+        cursor = _plain_cursor(conn)
+        # Most recently tagged wallets first; each wallet's rows are contiguous for groupby
         cursor.execute(
             """
-            SELECT DISTINCT wallet_address FROM wallet_tags
-            ORDER BY created_at DESC
+            SELECT wallet_address, tag, is_kol
+            FROM (
+                SELECT
+                    wallet_address, tag, is_kol, created_at,
+                    MAX(created_at) OVER (PARTITION BY wallet_address) AS last_tagged
+                FROM wallet_tags
+            )
+            ORDER BY last_tagged DESC, wallet_address, created_at DESC
         """
         )
-        wallets = []
-        for row in cursor.fetchall():
-            wallet_address = row[0]
-            tags = get_wallet_tags(wallet_address)
-            wallets.append({"wallet_address": wallet_address, "tags": tags})
-        return wallets
+        return [
+            {
+                "wallet_address": wallet_address,
+                "tags": [{"tag": tag, "is_kol": bool(is_kol)} for _, tag, is_kol in rows],
+            }
+            for wallet_address, rows in groupby(cursor, key=lambda row: row[0])
+        ]
 
 
 def soft_delete_token(token_id: int) -> bool:
@@ -1301,6 +2006,41 @@ def restore_token(token_id: int) -> bool:
         return success
 
 
+def set_token_deleted_at(token_id: int, deleted_at: Optional[str]) -> bool:
+    """
+    Set or clear a token's deleted_at timestamp, which is all the token routes use for the trash.
+    Unlike soft_delete_token, is_deleted and the token's files are left alone.
+
+    Args:
+        token_id: ID of the token
+        deleted_at: Deletion timestamp, or None to restore the token
+
+    Returns:
+        True if the token exists, False otherwise
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE analyzed_tokens SET deleted_at = ? WHERE id = ?", (deleted_at, token_id))
+        return cursor.rowcount > 0
+
+
+def delete_token_rows(token_id: int) -> bool:
+    """
+    Permanently delete a token's rows (CASCADE removes its runs and wallets) without
+    touching its files, unlike permanent_delete_token.
+
+    Args:
+        token_id: ID of the token to delete
+
+    Returns:
+        True if the token existed, False otherwise
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM analyzed_tokens WHERE id = ?", (token_id,))
+        return cursor.rowcount > 0
+
+
 def permanent_delete_token(token_id: int) -> bool:
     """
     Permanently delete a token and all its associated data.
@@ -1322,37 +2062,91 @@ def permanent_delete_token(token_id: int) -> bool:
         return cursor.rowcount > 0
 
 
-def get_deleted_tokens(limit: int = 50) -> List[Dict]:
+def get_deleted_tokens(limit: Optional[int] = 50) -> List[Dict]:
     """
     Get list of soft-deleted tokens, most recently deleted first.
 
     Args:
-        limit: Maximum number of tokens to return
+        limit: Maximum number of tokens to return, or None for all of them
 
     Returns:
         List of deleted token dictionaries
     """
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
+    with get_db_connection(readonly=True) as conn:
+        cursor = _plain_cursor(conn)
         cursor.execute(
             """
             SELECT
                 id, token_address, token_name, token_symbol, acronym,
-                analysis_timestamp, first_buy_timestamp, wallets_found, credits_used, last_analysis_credits,
-                is_deleted, deleted_at
+                analysis_timestamp, first_buy_timestamp, unique_wallet_count AS wallets_found,
+                credits_used, last_analysis_credits, is_deleted, deleted_at
             FROM analyzed_tokens
             WHERE is_deleted = 1
             ORDER BY deleted_at DESC
             LIMIT ?
         """,
-            (limit,),
+            # A negative LIMIT means no limit in SQLite
+            (-1 if limit is None else limit,),
         )
 
-        tokens = []
-        for row in cursor.fetchall():
-            tokens.append(dict(row))
+        return _rows_as_dicts(cursor)
 
-        return tokens
+
+def get_monitored_addresses() -> List[Dict]:
+    """Get all monitored addresses in registration order"""
+    with get_db_connection(readonly=True) as conn:
+        cursor = _plain_cursor(conn)
+        cursor.execute(_SQL_MONITORED_ADDRESSES)
+        return _rows_as_dicts(cursor)
+
+
+def save_monitored_addresses(entries: List[Dict]) -> int:
+    """
+    Insert or update monitored addresses in a single transaction.
+
+    Args:
+        entries: Address dicts with address, registered_at, threshold,
+            total_notifications, last_notification and note
+
+    Returns:
+        Number of addresses written
+    """
+    if not entries:
+        return 0
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            _SQL_UPSERT_MONITORED_ADDRESS,
+            [
+                (
+                    entry["address"],
+                    entry.get("registered_at"),
+                    entry.get("threshold"),
+                    entry.get("total_notifications") or 0,
+                    entry.get("last_notification"),
+                    entry.get("note"),
+                )
+                for entry in entries
+            ],
+        )
+        return len(entries)
+
+
+def delete_monitored_address(address: str) -> bool:
+    """Stop monitoring an address; returns False if it was not monitored"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(_SQL_DELETE_MONITORED_ADDRESS, (address,))
+        return cursor.rowcount > 0
+
+
+def clear_monitored_addresses() -> int:
+    """Remove every monitored address and return how many were removed"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM monitored_addresses")
+        return cursor.rowcount
 
 
 # Initialize database on module import
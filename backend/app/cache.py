@@ -7,7 +7,10 @@ Provides fast response caching to reduce database load and improve performance
 import asyncio
 import hashlib
 import time
-from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import orjson
 
 
 class ResponseCache:
@@ -16,20 +19,47 @@ class ResponseCache:
 
     Features:
     - TTL-based expiration (default: 30 seconds)
+    - Bounded size with least-recently-used eviction
     - ETag generation for conditional requests (304 Not Modified)
     - Request deduplication to prevent duplicate concurrent queries
     """
 
-    def __init__(self, ttl: int = 30):
+    def __init__(self, ttl: int = 30, max_size: int = 1024):
         """
         Initialize response cache
 
         Args:
             ttl: Time-to-live in seconds (default: 30)
+            max_size: Maximum number of entries kept (default: 1024)
         """
-        self.cache: Dict[str, Tuple[Any, float, str]] = {}  # (data, timestamp, etag)
+        # (data, timestamp, etag), least recently used first
+        self.cache: OrderedDict[str, Tuple[Any, float, str]] = OrderedDict()
         self.pending_requests: Dict[str, asyncio.Future] = {}  # Request deduplication
+        # Every "_"-separated key prefix -> keys under it, so invalidate() touches only its subtree
+        self.prefix_index: Dict[str, Set[str]] = {}
         self.ttl = ttl
+        self.max_size = max_size
+
+    @staticmethod
+    def _key_prefixes(key: str) -> List[str]:
+        """Prefixes of a key on "_" boundaries, e.g. "a_b_c" -> ["a", "a_b", "a_b_c"]"""
+        parts = key.split("_")
+        return ["_".join(parts[:end]) for end in range(1, len(parts) + 1)]
+
+    def _discard(self, key: str):
+        """Drop a key from the cache and the prefix index"""
+        self.cache.pop(key, None)
+        for prefix in self._key_prefixes(key):
+            keys = self.prefix_index.get(prefix)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.prefix_index[prefix]
+
+    def clear(self):
+        """Drop every cached entry"""
+        self.cache.clear()
+        self.prefix_index.clear()
 
     def get(self, key: str) -> Tuple[Optional[Any], Optional[str]]:
         """
@@ -41,11 +71,14 @@ class ResponseCache:
         Returns:
             Tuple of (data, etag) or (None, None) if not found/expired
         """
-        if key in self.cache:
-            data, timestamp, etag = self.cache[key]
-            if time.time() - timestamp < self.ttl:
+        entry = self.cache.get(key)
+        if entry is not None:
+            data, timestamp, etag = entry
+            # Monotonic clock so wall-clock adjustments cannot extend or cut short the TTL
+            if time.monotonic() - timestamp < self.ttl:
+                self.cache.move_to_end(key)
                 return (data, etag)
-            del self.cache[key]
+            self._discard(key)
         return (None, None)
 
     def set(self, key: str, data: Any) -> str:
@@ -60,7 +93,13 @@ class ResponseCache:
             Generated ETag string
         """
         etag = self._generate_etag(data)
-        self.cache[key] = (data, time.time(), etag)
+        if key not in self.cache:
+            for prefix in self._key_prefixes(key):
+                self.prefix_index.setdefault(prefix, set()).add(key)
+        self.cache[key] = (data, time.monotonic(), etag)
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_size:
+            self._discard(next(iter(self.cache)))
         return etag
 
     def _generate_etag(self, data: Any) -> str:
@@ -68,26 +107,24 @@ class ResponseCache:
         Generate ETag from response data
 
         Args:
-            data: Data to generate ETag for
+            data: Data to generate ETag for; pre-encoded bytes are hashed as they are
 
         Returns:
-            MD5 hash as ETag
+            BLAKE2b hash as ETag
         """
-        import json
-
-        content = json.dumps(data, sort_keys=True)
-        return hashlib.md5(content.encode()).hexdigest()
+        content = data if isinstance(data, bytes) else orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
 
-    def invalidate(self, pattern: str):
+    def invalidate(self, prefix: str):
         """
-        Invalidate cache entries matching pattern
+        Invalidate cache entries under a key prefix
 
         Args:
-            pattern: String pattern to match against keys
+            prefix: Whole "_"-separated leading segments of the keys to drop,
+                e.g. "multi_early_buyer_wallets" drops "multi_early_buyer_wallets_2"
         """
-        keys_to_delete = [k for k in self.cache.keys() if pattern in k]
-        for key in keys_to_delete:
-            del self.cache[key]
+        for key in list(self.prefix_index.get(prefix, ())):
+            self._discard(key)
 
     async def deduplicate_request(self, key: str, fetch_fn):
         """
@@ -102,19 +139,17 @@ class ResponseCache:
         Returns:
             Result from fetch_fn or pending request
         """
-        if key in self.pending_requests:
-            # Another request is already fetching, wait for it
-            return await self.pending_requests[key]
-
-        # Create future for this request
-        future = asyncio.Future()
-        self.pending_requests[key] = future
-
+        task = self.pending_requests.get(key)
+        if task is None:
+            # Run the fetch as its own task so every caller, including the first, awaits the
+            # same result or exception, and a cancelled caller cannot abort it for the others
+            task = asyncio.ensure_future(self._run_pending(key, fetch_fn))
+            self.pending_requests[key] = task
+        return await asyncio.shield(task)
+
+    async def _run_pending(self, key: str, fetch_fn):
+        """Run fetch_fn and stop tracking the key once it settles, successfully or not"""
         try:
-            result = await fetch_fn()
-            future.set_result(result)
-            return result
+            return await fetch_fn()
         finally:
-            # Remove from pending requests
-            if key in self.pending_requests:
-                del self.pending_requests[key]
+            self.pending_requests.pop(key, None)
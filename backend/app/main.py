@@ -5,6 +5,7 @@ Main entry point for the modular FastAPI application.
 Registers all routers and configures middleware.
 """
 
+import asyncio
 import logging
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
@@ -12,8 +13,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import ORJSONResponse
 
+import analyzed_tokens_db as db
+
 # Import routers
 from app.routers import analysis, metrics, settings_debug, tags, tokens, wallets, watchlist, webhooks
+from app.state import close_http_client, get_db_executor, set_main_loop, shutdown_executors
 from app.utils.models import AnalysisCompleteNotification, AnalysisStartNotification
 
 # Import WebSocket manager and notification endpoints
@@ -48,7 +52,8 @@ def create_app() -> FastAPI:
     )
 
     # GZip Compression Middleware (reduces payload size by 70-90%)
-    app.add_middleware(GZipMiddleware, minimum_size=1000)
+    # Level 5 keeps nearly all of level 9's ratio on JSON at a fraction of the CPU per response
+    app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=5)
 
     # Register routers
     app.include_router(settings_debug.router, tags=["Settings & Health"])
@@ -114,6 +119,12 @@ def create_app() -> FastAPI:
     # Startup event
     @app.on_event("startup")
     async def startup_event():
+        # Worker threads schedule WebSocket broadcasts on this loop
+        loop = asyncio.get_running_loop()
+        set_main_loop(loop)
+        # Bounded, named pool for the database calls handlers push off the loop
+        loop.set_default_executor(get_db_executor())
+
         print("=" * 80)
         print("Gun Del Sol - FastAPI Service (Modular Architecture)")
         print("=" * 80)
@@ -123,7 +134,7 @@ def create_app() -> FastAPI:
         print("[OK] Response caching with ETags (30s TTL + 304 responses)")
         print("[OK] Request deduplication (prevents duplicate concurrent queries)")
         print("[OK] GZip compression (70-90% payload reduction)")
-        print("[OK] Async database queries with aiosqlite")
+        print("[OK] Pooled SQLite connections with cached statements (WAL)")
         print("[OK] Fast JSON serialization (orjson - 5-10x faster)")
         print("=" * 80)
         print("Performance Features:")
@@ -134,6 +145,14 @@ def create_app() -> FastAPI:
         print("  - WebSocket notifications: real-time analysis updates")
         print("=" * 80)
 
+    # Shutdown event
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        # Closing the pooled connections checkpoints the WAL back into the database file
+        db.close_db_connections()
+        shutdown_executors()
+        await close_http_client()
+
     return app
 
 
@@ -5,16 +5,19 @@ Provides REST endpoints for queuing analysis jobs and checking status
 """
 
 import asyncio
+import concurrent.futures
 import csv
 import io
-import json
 import os
+import threading
 import uuid
+from contextlib import suppress
 from datetime import datetime
 from typing import Any, Dict, List
 
+import orjson
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
 
 import analyzed_tokens_db as db
 from app.observability import (
@@ -27,13 +30,20 @@ from app.observability import (
     sanitize_address,
     set_job_id,
 )
-from app.settings import CURRENT_API_SETTINGS, HELIUS_API_KEY
-from app.state import ANALYSIS_EXECUTOR, get_all_analysis_jobs, get_analysis_job, set_analysis_job, update_analysis_job
+from app.settings import HELIUS_API_KEY, get_cached_analysis_settings
+from app.state import (
+    get_analysis_executor,
+    get_analysis_job,
+    get_artifact_executor,
+    get_main_loop,
+    get_unfinished_analysis_jobs,
+    set_analysis_job,
+    update_analysis_job,
+)
 from app.utils.models import (
     AnalysisJob,
     AnalysisJobSummary,
     AnalysisListResponse,
-    AnalysisSettings,
     AnalyzeTokenRequest,
     QueueTokenResponse,
 )
@@ -43,6 +53,112 @@ from helius_api import TokenAnalyzer, generate_axiom_export, generate_token_acro
 
 router = APIRouter()
 
+# 1 MiB buffer so large result files reach disk in a few write syscalls
+ARTIFACT_BUFFER_SIZE = 1 << 20
+
+
+def write_json_artifact(filepath: str, payload: Any):
+    """Write a JSON artifact file, raising if it cannot be written"""
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    # orjson writes bytes directly; non-str keys are stringified as json.dump did
+    content = orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    temp_path = filepath + ".tmp"
+    try:
+        with open(temp_path, "wb", buffering=ARTIFACT_BUFFER_SIZE) as f:
+            f.write(content)
+        # Readers see either no file or the complete one, never a partial write
+        os.replace(temp_path, filepath)
+    except Exception:
+        with suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+
+def log_notification_result(future: concurrent.futures.Future):
+    """Log the outcome of a completion broadcast scheduled on the app's event loop"""
+    if future.cancelled():
+        log_error("Failed to send WebSocket notification", error="broadcast cancelled")
+    elif future.exception() is not None:
+        log_error("Failed to send WebSocket notification", error=str(future.exception()))
+    else:
+        log_info("WebSocket notification sent", event="analysis_complete")
+
+
+def finish_analysis_job(
+    job_id: str,
+    token_id: int,
+    result: Dict[str, Any],
+    axiom_export: Any,
+    analysis_filepath: str,
+    axiom_filepath: str,
+    notification_data: Dict[str, Any],
+):
+    """
+    Write a finished analysis's files, then record them and report the job completed
+
+    Runs on the artifact executor so the analysis thread can start its next job. The job stays
+    "processing", with its result in memory, until the files exist, so nothing reads or
+    trashes them before they are written. If either file cannot be written, the job fails
+    and no paths are recorded.
+    """
+    try:
+        write_json_artifact(analysis_filepath, result)
+        write_json_artifact(axiom_filepath, axiom_export)
+
+        # Update database with file paths
+        db.update_token_file_paths(token_id, analysis_filepath, axiom_filepath)
+
+        result_filename = os.path.basename(analysis_filepath)
+
+        # Update job with results
+        update_analysis_job(
+            job_id,
+            {
+                "status": "completed",
+                "result": result,
+                "result_file": result_filename,
+                "axiom_file": axiom_filepath,
+                "token_id": token_id,
+            },
+        )
+    except Exception as e:
+        error_msg = str(e)
+        metrics_collector.job_failed(job_id, error_msg)
+        log_analysis_failed(job_id, error_msg)
+        update_analysis_job(job_id, {"status": "failed", "error": error_msg})
+        return
+
+    # Track completion metrics
+    credits_used = result.get("api_credits_used", 0)
+    metrics_collector.job_completed(job_id, notification_data["wallets_found"], credits_used)
+    log_analysis_complete(job_id, notification_data["wallets_found"], credits_used)
+
+    # Send WebSocket notification
+    try:
+        notification_message = {"event": "analysis_complete", "data": notification_data}
+        main_loop = get_main_loop()
+        if main_loop is None:
+            raise RuntimeError("application event loop is not running")
+        manager = get_connection_manager()
+        # Not waited on, so the artifact thread moves straight on to the next finished job
+        future = asyncio.run_coroutine_threadsafe(manager.broadcast(notification_message), main_loop)
+        future.add_done_callback(log_notification_result)
+    except Exception as notify_error:
+        log_error("Failed to send WebSocket notification", error=str(notify_error))
+
+
+# One analyzer per analysis executor thread: its requests.Session is not thread-safe,
+# but reusing it keeps Helius connections alive from one job to the next
+_thread_analyzers = threading.local()
+
+
+def get_thread_analyzer() -> TokenAnalyzer:
+    """Get the calling thread's TokenAnalyzer, creating it on first use"""
+    analyzer = getattr(_thread_analyzers, "analyzer", None)
+    if analyzer is None:
+        analyzer = _thread_analyzers.analyzer = TokenAnalyzer(HELIUS_API_KEY)
+    return analyzer
+
 
 def run_token_analysis_sync(
     job_id: str,
@@ -60,8 +176,7 @@ def run_token_analysis_sync(
         log_analysis_start(job_id, token_address)
         update_analysis_job(job_id, {"status": "processing"})
 
-        analyzer = TokenAnalyzer(HELIUS_API_KEY)
-        result = analyzer.analyze_token(
+        result = get_thread_analyzer().analyze_token(
             mint_address=token_address,
             min_usd=min_usd,
             time_window_hours=time_window_hours,
@@ -94,8 +209,9 @@ def run_token_analysis_sync(
 
         # Convert datetime objects to strings
         for bidder in early_bidders:
-            if "first_buy_time" in bidder and hasattr(bidder["first_buy_time"], "isoformat"):
-                bidder["first_buy_time"] = bidder["first_buy_time"].isoformat()
+            first_buy_time = bidder.get("first_buy_time")
+            if isinstance(first_buy_time, datetime):
+                bidder["first_buy_time"] = first_buy_time.isoformat()
 
         # Generate Axiom export
         axiom_export = generate_axiom_export(
@@ -120,60 +236,25 @@ def run_token_analysis_sync(
         analysis_filepath = db.get_analysis_file_path(token_id, token_name, in_trash=False)
         axiom_filepath = db.get_axiom_file_path(token_id, acronym, in_trash=False)
 
-        # Ensure directories exist
-        os.makedirs(os.path.dirname(analysis_filepath), exist_ok=True)
-        os.makedirs(os.path.dirname(axiom_filepath), exist_ok=True)
-
-        # Save files
-        with open(analysis_filepath, "w") as f:
-            json.dump(result, f, indent=2)
-        with open(axiom_filepath, "w") as f:
-            json.dump(axiom_export, f, indent=2)
-
-        # Update database with file paths
-        db.update_token_file_paths(token_id, analysis_filepath, axiom_filepath)
-
-        result_filename = os.path.basename(analysis_filepath)
-
-        # Update job with results
-        update_analysis_job(
+        # The artifact writer completes the job once the files are on disk
+        get_artifact_executor().submit(
+            finish_analysis_job,
             job_id,
+            token_id,
+            result,
+            axiom_export,
+            analysis_filepath,
+            axiom_filepath,
             {
-                "status": "completed",
-                "result": result,
-                "result_file": result_filename,
-                "axiom_file": axiom_filepath,
+                "job_id": job_id,
+                "token_name": token_name,
+                "token_symbol": token_symbol,
+                "acronym": acronym,
+                "wallets_found": len(early_bidders),
                 "token_id": token_id,
             },
         )
 
-        # Track completion metrics
-        credits_used = result.get("api_credits_used", 0)
-        metrics_collector.job_completed(job_id, len(early_bidders), credits_used)
-        log_analysis_complete(job_id, len(early_bidders), credits_used)
-
-        # Send WebSocket notification
-        try:
-            notification_message = {
-                "event": "analysis_complete",
-                "data": {
-                    "job_id": job_id,
-                    "token_name": token_name,
-                    "token_symbol": token_symbol,
-                    "acronym": acronym,
-                    "wallets_found": len(early_bidders),
-                    "token_id": token_id,
-                },
-            }
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            manager = get_connection_manager()
-            loop.run_until_complete(manager.broadcast(notification_message))
-            loop.close()
-            log_info("WebSocket notification sent", event="analysis_complete")
-        except Exception as notify_error:
-            log_error("Failed to send WebSocket notification", error=str(notify_error))
-
     except Exception as e:
         error_msg = str(e)
         metrics_collector.job_failed(job_id, error_msg)
@@ -187,7 +268,7 @@ async def analyze_token(request: AnalyzeTokenRequest):
     if not is_valid_solana_address(request.address):
         raise HTTPException(status_code=400, detail="Invalid Solana address format")
 
-    settings = request.api_settings or AnalysisSettings(**CURRENT_API_SETTINGS)
+    settings = request.api_settings or get_cached_analysis_settings()
     min_usd = request.min_usd if request.min_usd is not None else settings.minUsdFilter
 
     job_id = str(uuid.uuid4())[:8]
@@ -216,7 +297,7 @@ async def analyze_token(request: AnalyzeTokenRequest):
     )
 
     # Submit to thread pool
-    ANALYSIS_EXECUTOR.submit(
+    get_analysis_executor().submit(
         run_token_analysis_sync,
         job_id,
         request.address,
@@ -241,6 +322,19 @@ async def analyze_token(request: AnalyzeTokenRequest):
     }
 
 
+# AnalysisJob fields, the keys of a job returned by GET /analysis/{job_id}
+ANALYSIS_JOB_FIELDS = (
+    "job_id",
+    "token_address",
+    "status",
+    "created_at",
+    "result",
+    "error",
+    "axiom_file",
+    "result_file",
+)
+
+
 @router.get("/analysis/{job_id}", response_model=AnalysisJob)
 async def get_analysis(job_id: str):
     """Get analysis job status and results"""
@@ -248,33 +342,37 @@ async def get_analysis(job_id: str):
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    job_copy = job.copy()
+    # Only the AnalysisJob fields go out, and the response is encoded directly: validating a
+    # multi-MB result against the response model would deep-copy it first
+    payload = {field: job.get(field) for field in ANALYSIS_JOB_FIELDS}
 
-    # If completed, load result from file if not in memory
-    if job_copy["status"] == "completed" and job_copy.get("result") is None:
+    # If completed, embed the result file as-is if the result is not in memory
+    if payload["status"] == "completed" and payload["result"] is None and payload["result_file"]:
+        result_file = os.path.join("analysis_results", payload["result_file"])
         try:
-            if "result_file" in job_copy:
-                result_file = os.path.join("analysis_results", job_copy["result_file"])
-                if os.path.exists(result_file):
-                    with open(result_file, "r") as f:
-                        job_copy["result"] = json.load(f)
-        except Exception as e:
-            job_copy["status"] = "failed"
-            job_copy["error"] = f"Could not load results: {str(e)}"
+            if os.path.exists(result_file):
+                with open(result_file, "rb") as f:
+                    payload["result"] = orjson.Fragment(f.read())
+        except OSError as e:
+            payload["status"] = "failed"
+            payload["error"] = f"Could not load results: {str(e)}"
 
-    return job_copy
+    return ORJSONResponse(payload)
 
 
 @router.get("/analysis", response_model=AnalysisListResponse)
 async def list_analyses(search: str = None, limit: int = 100):
     """List analysis jobs and completed tokens"""
     try:
+        # Pooled sqlite3 reads run in the executor so they don't block the event loop
+        loop = asyncio.get_running_loop()
         if search:
-            tokens = db.search_tokens(search.strip())
+            tokens = await loop.run_in_executor(None, db.search_tokens, search.strip())
         else:
-            tokens = db.get_analyzed_tokens(limit=limit)
+            tokens = await loop.run_in_executor(None, db.get_analyzed_tokens, limit)
 
-        jobs: List[Dict[str, Any]] = []
+        # In-progress jobs first, newest at the top
+        jobs: List[Dict[str, Any]] = [] if search else list(reversed(get_unfinished_analysis_jobs().values()))
         for token in tokens:
             jobs.append(
                 {
@@ -291,18 +389,44 @@ async def list_analyses(search: str = None, limit: int = 100):
                 }
             )
 
-        # Add in-progress jobs
-        if not search:
-            for job in get_all_analysis_jobs().values():
-                if job.get("status") != "completed":
-                    jobs.insert(0, job)
-
         return {"total": len(jobs), "jobs": jobs}
     except Exception as exc:
         log_error(f"Failed to list analyses: {exc}")
         raise HTTPException(status_code=500, detail=str(exc))
 
 
+# Bidder rows written to the CSV buffer before each chunk is sent
+CSV_CHUNK_ROWS = 500
+
+
+def iter_csv_chunks(early_bidders: List[Dict[str, Any]]):
+    """Yield the bidder CSV in chunks of CSV_CHUNK_ROWS rows, reusing one small buffer"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writerow = writer.writerow
+    writerow(["Wallet Address", "First Buy Time", "Total USD", "Transaction Count", "Average Buy USD"])
+
+    for index, bidder in enumerate(early_bidders, 1):
+        get = bidder.get
+        writerow(
+            [
+                bidder["wallet_address"],
+                get("first_buy_time", ""),
+                f"${get('total_usd', 0):.2f}",
+                get("transaction_count", 0),
+                f"${get('average_buy_usd', 0):.2f}",
+            ]
+        )
+        if index % CSV_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    remainder = buffer.getvalue()
+    if remainder:
+        yield remainder
+
+
 @router.get("/analysis/{job_id}/csv")
 async def export_analysis_csv(job_id: str):
     """Export analysis results as CSV"""
@@ -313,24 +437,8 @@ async def export_analysis_csv(job_id: str):
     if job["status"] != "completed" or not job.get("result"):
         raise HTTPException(status_code=400, detail="Analysis not completed or no results")
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["Wallet Address", "First Buy Time", "Total USD", "Transaction Count", "Average Buy USD"])
-
-    for bidder in job["result"].get("early_bidders", []):
-        writer.writerow(
-            [
-                bidder["wallet_address"],
-                bidder.get("first_buy_time", ""),
-                f"${bidder.get('total_usd', 0):.2f}",
-                bidder.get("transaction_count", 0),
-                f"${bidder.get('average_buy_usd', 0):.2f}",
-            ]
-        )
-
-    output.seek(0)
     return StreamingResponse(
-        iter([output.getvalue()]),
+        iter_csv_chunks(job["result"].get("early_bidders", [])),
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename=token_analysis_{job_id}.csv"},
     )
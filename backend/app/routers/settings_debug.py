@@ -6,7 +6,7 @@ Provides REST endpoints for managing API settings and debug configuration
 
 from fastapi import APIRouter, HTTPException
 
-from app.settings import CURRENT_API_SETTINGS, save_api_settings
+from app.settings import CURRENT_API_SETTINGS, invalidate_analysis_settings, save_api_settings
 from app.utils.models import UpdateSettingsRequest
 from app.websocket import get_connection_manager
 from debug_config import DEBUG_MODE, get_debug_js_flag
@@ -103,6 +103,7 @@ async def update_api_settings(payload: UpdateSettingsRequest):
 
     # Update in-memory settings
     CURRENT_API_SETTINGS.update(updates)
+    invalidate_analysis_settings()
 
     # Persist to file
     if not save_api_settings(CURRENT_API_SETTINGS):
@@ -4,11 +4,11 @@ Tags router - wallet tagging and Codex endpoints
 Provides REST endpoints for wallet tagging operations
 """
 
-import aiosqlite
-from fastapi import APIRouter, HTTPException
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Request, Response
 
 import analyzed_tokens_db as db
-from app import settings
 from app.cache import ResponseCache
 from app.utils.models import (
     AddTagRequest,
@@ -26,94 +26,67 @@ cache = ResponseCache()
 
 
 @router.get("/wallets/{wallet_address}/tags", response_model=WalletTagsResponse)
-async def get_wallet_tags(wallet_address: str):
+def get_wallet_tags(wallet_address: str):
     """Get tags for a wallet"""
-    async with aiosqlite.connect(settings.DATABASE_FILE) as conn:
-        conn.row_factory = aiosqlite.Row
-        query = "SELECT tag, is_kol FROM wallet_tags WHERE wallet_address = ?"
-        cursor = await conn.execute(query, (wallet_address,))
-        rows = await cursor.fetchall()
-        tags = [{"tag": row[0], "is_kol": bool(row[1])} for row in rows]
-        return {"tags": tags}
+    return {"tags": db.get_wallet_tags(wallet_address)}
 
 
 @router.post("/wallets/{wallet_address}/tags", response_model=MessageResponse)
 async def add_wallet_tag(wallet_address: str, request: AddTagRequest):
     """Add a tag to a wallet"""
-    async with aiosqlite.connect(settings.DATABASE_FILE) as conn:
-        try:
-            await conn.execute(
-                "INSERT INTO wallet_tags (wallet_address, tag, is_kol) VALUES (?, ?, ?)",
-                (wallet_address, request.tag, request.is_kol),
-            )
-            await conn.commit()
-        except aiosqlite.IntegrityError:
-            raise HTTPException(status_code=400, detail="Tag already exists for this wallet")
+    loop = asyncio.get_running_loop()
+    added = await loop.run_in_executor(None, db.add_wallet_tag, wallet_address, request.tag, request.is_kol)
+    if not added:
+        raise HTTPException(status_code=400, detail="Tag already exists for this wallet")
 
     cache.invalidate("codex")
+    cache.invalidate("all_tags")
     return {"message": "Tag added successfully"}
 
 
 @router.delete("/wallets/{wallet_address}/tags", response_model=MessageResponse)
 async def remove_wallet_tag(wallet_address: str, request: RemoveTagRequest):
     """Remove a tag from a wallet"""
-    async with aiosqlite.connect(settings.DATABASE_FILE) as conn:
-        await conn.execute(
-            "DELETE FROM wallet_tags WHERE wallet_address = ? AND tag = ?", (wallet_address, request.tag)
-        )
-        await conn.commit()
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, db.remove_wallet_tag, wallet_address, request.tag)
 
     cache.invalidate("codex")
+    cache.invalidate("all_tags")
     return {"message": "Tag removed successfully"}
 
 
 @router.get("/tags", response_model=TagsResponse)
-async def get_all_tags():
-    """Get all unique tags"""
+async def get_all_tags(request: Request, response: Response):
+    """Get all unique tags (with caching)"""
     cache_key = "all_tags"
-    cached_data, _ = cache.get(cache_key)
+    cached_data, cached_etag = cache.get(cache_key)
     if cached_data:
+        if request.headers.get("if-none-match") == cached_etag:
+            return Response(status_code=304)
+        response.headers["ETag"] = cached_etag
         return cached_data
 
-    async with aiosqlite.connect(settings.DATABASE_FILE) as conn:
-        query = "SELECT DISTINCT tag FROM wallet_tags ORDER BY tag"
-        cursor = await conn.execute(query)
-        rows = await cursor.fetchall()
-        tags = [row[0] for row in rows]
-        result = {"tags": tags}
-        cache.set(cache_key, result)
-        return result
+    loop = asyncio.get_running_loop()
+    result = {"tags": await loop.run_in_executor(None, db.get_all_tags)}
+    response.headers["ETag"] = cache.set(cache_key, result)
+    return result
 
 
 @router.get("/codex", response_model=CodexResponse)
-async def get_codex():
-    """Get all wallets with tags (Codex)"""
+async def get_codex(request: Request, response: Response):
+    """Get all wallets with tags (Codex) (with caching)"""
     cache_key = "codex"
-    cached_data, _ = cache.get(cache_key)
+    cached_data, cached_etag = cache.get(cache_key)
     if cached_data:
+        if request.headers.get("if-none-match") == cached_etag:
+            return Response(status_code=304)
+        response.headers["ETag"] = cached_etag
         return cached_data
 
-    async with aiosqlite.connect(settings.DATABASE_FILE) as conn:
-        conn.row_factory = aiosqlite.Row
-        query = """
-            SELECT wallet_address, tag, is_kol
-            FROM wallet_tags
-            ORDER BY wallet_address, tag
-        """
-        cursor = await conn.execute(query)
-        rows = await cursor.fetchall()
-
-        # Group by wallet_address
-        wallets_dict = {}
-        for row in rows:
-            wallet_addr = row[0]
-            if wallet_addr not in wallets_dict:
-                wallets_dict[wallet_addr] = {"wallet_address": wallet_addr, "tags": []}
-            wallets_dict[wallet_addr]["tags"].append({"tag": row[1], "is_kol": bool(row[2])})
-
-        result = {"wallets": list(wallets_dict.values())}
-        cache.set(cache_key, result)
-        return result
+    loop = asyncio.get_running_loop()
+    result = {"wallets": await loop.run_in_executor(None, db.get_all_tagged_wallets)}
+    response.headers["ETag"] = cache.set(cache_key, result)
+    return result
 
 
 @router.post("/wallets/batch-tags")
@@ -122,7 +95,8 @@ async def get_batch_wallet_tags(payload: BatchTagsRequest):
     if not payload.addresses:
         raise HTTPException(status_code=400, detail="addresses array is required")
     try:
-        return db.get_multi_wallet_tags(payload.addresses)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, db.get_multi_wallet_tags, payload.addresses)
     except Exception as exc:
         log_error(f"Failed to get batch wallet tags: {exc}")
         raise HTTPException(status_code=500, detail=str(exc))
@@ -132,7 +106,8 @@ async def get_batch_wallet_tags(payload: BatchTagsRequest):
 async def get_wallets_by_tag(tag: str):
     """Get all wallets with a specific tag"""
     try:
-        wallets = db.get_wallets_by_tag(tag)
+        loop = asyncio.get_running_loop()
+        wallets = await loop.run_in_executor(None, db.get_wallets_by_tag, tag)
         return {"tag": tag, "wallets": wallets}
     except Exception as exc:
         log_error(f"Failed to get wallets by tag: {exc}")
@@ -6,12 +6,13 @@ Provides REST endpoints for wallet operations
 
 import asyncio
 
-import aiosqlite
-import requests
-from fastapi import APIRouter, HTTPException
+import orjson
+from fastapi import APIRouter, HTTPException, Request, Response
 
+import analyzed_tokens_db as db
 from app import settings
 from app.cache import ResponseCache
+from app.state import get_http_client
 from app.utils.models import (
     MultiTokenWalletsResponse,
     RefreshBalancesRequest,
@@ -23,48 +24,22 @@ cache = ResponseCache()
 
 
 @router.get("/multi-token-wallets", response_model=MultiTokenWalletsResponse)
-async def get_multi_early_buyer_wallets(min_tokens: int = 2):
-    """Get wallets that appear in multiple tokens"""
+async def get_multi_early_buyer_wallets(request: Request, min_tokens: int = 2):
+    """Get wallets that appear in multiple tokens (with caching)"""
+    # The encoded body is cached, so hits skip validation and serialization entirely
     cache_key = f"multi_early_buyer_wallets_{min_tokens}"
-    cached_data, _ = cache.get(cache_key)
-    if cached_data:
-        return cached_data
-
-    async with aiosqlite.connect(settings.DATABASE_FILE) as conn:
-        conn.row_factory = aiosqlite.Row
-        query = """
-            SELECT
-                tw.wallet_address,
-                COUNT(DISTINCT tw.token_id) as token_count,
-                GROUP_CONCAT(DISTINCT t.token_name) as token_names,
-                GROUP_CONCAT(DISTINCT t.token_address) as token_addresses,
-                GROUP_CONCAT(DISTINCT t.id) as token_ids,
-                MAX(tw.wallet_balance_usd) as wallet_balance_usd
-            FROM early_buyer_wallets tw
-            JOIN analyzed_tokens t ON tw.token_id = t.id
-            WHERE t.deleted_at IS NULL
-            GROUP BY tw.wallet_address
-            HAVING COUNT(DISTINCT tw.token_id) >= ?
-            ORDER BY token_count DESC, wallet_balance_usd DESC
-        """
-        cursor = await conn.execute(query, (min_tokens,))
-        rows = await cursor.fetchall()
-
-        wallets = []
-        for row in rows:
-            wallet_dict = dict(row)
-            wallet_dict["token_names"] = wallet_dict["token_names"].split(",") if wallet_dict["token_names"] else []
-            wallet_dict["token_addresses"] = (
-                wallet_dict["token_addresses"].split(",") if wallet_dict["token_addresses"] else []
-            )
-            wallet_dict["token_ids"] = [
-                int(id) for id in wallet_dict["token_ids"].split(",") if wallet_dict["token_ids"]
-            ]
-            wallets.append(wallet_dict)
+    body, etag = cache.get(cache_key)
+    if body is None:
+        # Read on a pooled, already-tuned connection, off the event loop
+        loop = asyncio.get_running_loop()
+        wallets = await loop.run_in_executor(None, db.get_multi_early_buyer_wallets, min_tokens)
+        body = orjson.dumps({"total": len(wallets), "wallets": wallets})
+        etag = cache.set(cache_key, body)
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304)
 
-        result = {"total": len(wallets), "wallets": wallets}
-        cache.set(cache_key, result)
-        return result
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 
 @router.post("/wallets/refresh-balances", response_model=RefreshBalancesResponse)
@@ -76,14 +51,13 @@ async def refresh_wallet_balances(request: RefreshBalancesRequest):
     if not api_key:
         raise HTTPException(status_code=500, detail="Helius API key not configured")
 
+    # Requests are multiplexed on the event loop over the shared client's pooled connections
+    client = get_http_client()
+
     async def fetch_balance(wallet_address: str):
         try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: requests.get(
-                    f"https://api.helius.xyz/v0/addresses/{wallet_address}/balances?api-key={api_key}", timeout=10
-                ),
+            response = await client.get(
+                f"https://api.helius.xyz/v0/addresses/{wallet_address}/balances", params={"api-key": api_key}
             )
 
             if response.status_code == 200:
@@ -98,15 +72,15 @@ async def refresh_wallet_balances(request: RefreshBalancesRequest):
     # Fetch all balances concurrently
     results = await asyncio.gather(*[fetch_balance(addr) for addr in wallet_addresses])
 
-    # Update database
-    async with aiosqlite.connect(settings.DATABASE_FILE) as conn:
-        for result in results:
-            if result["success"] and result["balance_usd"] is not None:
-                await conn.execute(
-                    "UPDATE early_buyer_wallets SET wallet_balance_usd = ? WHERE wallet_address = ?",
-                    (result["balance_usd"], result["wallet_address"]),
-                )
-        await conn.commit()
+    # Update database in one transaction
+    balances = [
+        (result["wallet_address"], result["balance_usd"])
+        for result in results
+        if result["success"] and result["balance_usd"] is not None
+    ]
+    if balances:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, db.update_wallet_balances, balances)
 
     cache.invalidate("multi_early_buyer_wallets")
 
@@ -5,27 +5,46 @@ Provides REST endpoints for creating and managing Helius webhooks
 """
 
 import asyncio
+import threading
 from datetime import datetime
+from itertools import chain, repeat
 
 from fastapi import APIRouter, HTTPException, Request
 
 import analyzed_tokens_db as db
 from app.settings import HELIUS_API_KEY
-from app.state import WEBHOOK_EXECUTOR
+from app.state import get_activity_executor, get_webhook_executor
 from app.utils.models import CreateWebhookRequest
 from helius_api import WebhookManager
 
 router = APIRouter()
 
+# Deliveries allowed to wait for the activity writer; beyond this, callbacks get a 503 and Helius retries later
+MAX_PENDING_ACTIVITY_WRITES = 1000
+_pending_activity_writes = threading.BoundedSemaphore(MAX_PENDING_ACTIVITY_WRITES)
+
 
 def _require_helius():
     if not HELIUS_API_KEY:
         raise HTTPException(status_code=503, detail="Helius API not available")
 
 
+# One manager per webhook executor thread: requests.Session is not thread-safe,
+# but reusing it keeps the HTTPS connection to the Helius webhook API alive
+_thread_managers = threading.local()
+
+
+def _get_webhook_manager() -> WebhookManager:
+    """Get the calling thread's WebhookManager, creating it on first use"""
+    manager = getattr(_thread_managers, "manager", None)
+    if manager is None:
+        manager = _thread_managers.manager = WebhookManager(HELIUS_API_KEY)
+    return manager
+
+
 async def _run_webhook_task(func):
     loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(WEBHOOK_EXECUTOR, func)
+    return await loop.run_in_executor(get_webhook_executor(), func)
 
 
 @router.post("/webhooks/create", status_code=202)
@@ -45,8 +64,7 @@ async def create_webhook(payload: CreateWebhookRequest):
 
     def worker():
         try:
-            manager = WebhookManager(HELIUS_API_KEY)
-            result = manager.create_webhook(
+            result = _get_webhook_manager().create_webhook(
                 webhook_url=callback_url, wallet_addresses=wallet_addresses, transaction_types=["TRANSFER", "SWAP"]
             )
             webhook_id = result.get("webhookID")
@@ -56,7 +74,7 @@ async def create_webhook(payload: CreateWebhookRequest):
             print(f"[Webhook] Error creating webhook: {exc}")
             return None
 
-    WEBHOOK_EXECUTOR.submit(worker)
+    get_webhook_executor().submit(worker)
 
     return {
         "status": "queued",
@@ -72,8 +90,7 @@ async def list_webhooks():
     _require_helius()
 
     def worker():
-        manager = WebhookManager(HELIUS_API_KEY)
-        return manager.list_webhooks()
+        return _get_webhook_manager().list_webhooks()
 
     try:
         webhooks = await _run_webhook_task(worker)
@@ -89,8 +106,7 @@ async def get_webhook_details(webhook_id: str):
     _require_helius()
 
     def worker():
-        manager = WebhookManager(HELIUS_API_KEY)
-        return manager.get_webhook(webhook_id)
+        return _get_webhook_manager().get_webhook(webhook_id)
 
     webhook = await _run_webhook_task(worker)
     if not webhook:
@@ -104,14 +120,24 @@ async def delete_webhook(webhook_id: str):
     _require_helius()
 
     def worker():
-        manager = WebhookManager(HELIUS_API_KEY)
-        manager.delete_webhook(webhook_id)
+        _get_webhook_manager().delete_webhook(webhook_id)
         print(f"[Webhook] Deleted webhook {webhook_id}")
 
-    WEBHOOK_EXECUTOR.submit(worker)
+    get_webhook_executor().submit(worker)
     return {"status": "queued", "message": f"Webhook {webhook_id} deletion queued"}
 
 
+def _save_activity_events(events):
+    """Write one webhook delivery; runs on the activity executor, so failures are logged rather than raised"""
+    try:
+        saved = db.save_wallet_activities(events)
+        print(f"[Webhook] Saved {saved} of {len(events)} activity events")
+    except Exception as exc:
+        print(f"[Webhook] Failed to save activity: {exc}")
+    finally:
+        _pending_activity_writes.release()
+
+
 @router.post("/webhooks/callback")
 async def webhook_callback(request: Request):
     """Receive webhook notifications from Helius"""
@@ -122,41 +148,55 @@ async def webhook_callback(request: Request):
 
     transactions = payload if isinstance(payload, list) else [payload]
 
+    events = []
     for tx in transactions:
         signature = tx.get("signature")
         timestamp = tx.get("timestamp")
+        # Shared by every transfer of the transaction, so formatted once
+        timestamp_iso = datetime.utcfromtimestamp(timestamp).isoformat() if timestamp else None
         tx_type = tx.get("type")
         description = tx.get("description", "")
-        native_transfers = tx.get("nativeTransfers", [])
-        token_transfers = tx.get("tokenTransfers", [])
 
-        for transfer in native_transfers + token_transfers:
+        # Each transfer is tagged with its kind as it is iterated, without building a combined list
+        transfers = chain(
+            zip(tx.get("nativeTransfers", []), repeat(True)), zip(tx.get("tokenTransfers", []), repeat(False))
+        )
+
+        for transfer, is_native in transfers:
             wallet_address = transfer.get("fromUserAccount") or transfer.get("toUserAccount")
             if not wallet_address:
                 continue
 
-            if transfer in native_transfers:
+            if is_native:
+                # Native amounts are in lamports
                 sol_amount = transfer.get("amount", 0) / 1e9
                 token_amount = 0.0
-                recipient = transfer.get("toUserAccount")
             else:
                 sol_amount = 0.0
                 token_amount = float(transfer.get("tokenAmount", 0))
-                recipient = transfer.get("toUserAccount")
-
-            try:
-                db.save_wallet_activity(
-                    wallet_address=wallet_address,
-                    transaction_signature=signature,
-                    timestamp=datetime.utcfromtimestamp(timestamp).isoformat() if timestamp else None,
-                    activity_type=tx_type,
-                    description=description,
-                    sol_amount=sol_amount,
-                    token_amount=token_amount,
-                    recipient_address=recipient,
-                )
-                print(f"[Webhook] Saved activity for wallet {wallet_address[:8]}...")
-            except Exception as exc:
-                print(f"[Webhook] Failed to save activity: {exc}")
+
+            events.append(
+                {
+                    "wallet_address": wallet_address,
+                    "transaction_signature": signature,
+                    "timestamp": timestamp_iso,
+                    "activity_type": tx_type,
+                    "description": description,
+                    "sol_amount": sol_amount,
+                    "token_amount": token_amount,
+                    "recipient_address": transfer.get("toUserAccount"),
+                }
+            )
+
+    # Save the whole delivery in one transaction on the writer thread and answer right away
+    if events:
+        if not _pending_activity_writes.acquire(blocking=False):
+            raise HTTPException(status_code=503, detail="Activity writes backlogged, retry later")
+        try:
+            get_activity_executor().submit(_save_activity_events, events)
+        except RuntimeError:
+            # The executor is shut down (app stopping); the task never runs to release the permit
+            _pending_activity_writes.release()
+            raise HTTPException(status_code=503, detail="Activity writer unavailable, retry later")
 
     return {"status": "success", "processed": len(transactions)}
@@ -4,11 +4,13 @@ Watchlist service - manages monitored addresses
 Handles loading, saving, and manipulating the watchlist (monitored addresses)
 """
 
-import json
 import os
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+import orjson
+
+import analyzed_tokens_db as db
 from app import settings
 from app.state import (
     clear_monitored_addresses,
@@ -25,34 +27,43 @@ class WatchlistService:
     """Service for managing monitored wallet addresses"""
 
     def __init__(self):
-        """Initialize watchlist service and load addresses from disk"""
+        """Initialize watchlist service and load addresses from the database"""
         self.load_addresses()
 
     def load_addresses(self):
-        """Load monitored addresses from JSON file"""
-        if os.path.exists(settings.DATA_FILE):
-            try:
-                with open(settings.DATA_FILE, "r") as f:
-                    data = json.load(f)
-                    # Update the state
-                    monitored_addresses.clear()
-                    monitored_addresses.update(data)
-                print(f"[Watchlist] Loaded {len(monitored_addresses)} monitored addresses from disk")
-            except Exception as exc:
-                print(f"[Watchlist] Failed to load monitored addresses: {exc}")
-                monitored_addresses.clear()
-        else:
-            monitored_addresses.clear()
-
-    def save_addresses(self) -> bool:
-        """Persist monitored addresses to JSON"""
+        """Load monitored addresses from the database into the in-memory state"""
         try:
-            with open(settings.DATA_FILE, "w") as f:
-                json.dump(get_all_monitored_addresses(), f, indent=2)
-            return True
+            entries = db.get_monitored_addresses() or self._migrate_data_file()
         except Exception as exc:
-            print(f"[Watchlist] Failed to save addresses: {exc}")
-            return False
+            print(f"[Watchlist] Failed to load monitored addresses: {exc}")
+            entries = []
+
+        monitored_addresses.clear()
+        monitored_addresses.update((entry["address"], entry) for entry in entries)
+        print(f"[Watchlist] Loaded {len(monitored_addresses)} monitored addresses")
+
+    def _migrate_data_file(self) -> List[Dict[str, Any]]:
+        """
+        Move addresses from the old JSON watchlist file into the database
+
+        The file is renamed afterwards so clearing the watchlist later does not bring them back.
+
+        Returns:
+            Imported address entries
+        """
+        if not os.path.exists(settings.DATA_FILE):
+            return []
+
+        with open(settings.DATA_FILE, "rb") as f:
+            data = orjson.loads(f.read())
+        if not data:
+            return []
+
+        entries = list(data.values())
+        db.save_monitored_addresses(entries)
+        os.replace(settings.DATA_FILE, settings.DATA_FILE + ".migrated")
+        print(f"[Watchlist] Migrated {len(entries)} monitored addresses from {settings.DATA_FILE}")
+        return entries
 
     def register_address(self, address: str, note: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -83,12 +94,14 @@ class WatchlistService:
             "note": note,
         }
 
-        set_monitored_address(address, address_data)
-
-        if not self.save_addresses():
-            remove_monitored_address(address)
+        try:
+            db.save_monitored_addresses([address_data])
+        except Exception as exc:
+            print(f"[Watchlist] Failed to save address: {exc}")
             raise Exception("Failed to save address")
 
+        set_monitored_address(address, address_data)
+
         return {
             "status": "success",
             "message": "Address registered for monitoring",
@@ -132,8 +145,8 @@ class WatchlistService:
         if not get_monitored_address(address):
             raise ValueError("Address not found")
 
+        db.delete_monitored_address(address)
         remove_monitored_address(address)
-        self.save_addresses()
 
         return {"status": "success", "message": "Address removed from monitoring", "address": address}
 
@@ -152,9 +165,9 @@ class WatchlistService:
         if not address_data:
             raise ValueError("Address not found")
 
-        address_data["note"] = note
+        address_data = {**address_data, "note": note}
+        db.save_monitored_addresses([address_data])
         set_monitored_address(address, address_data)
-        self.save_addresses()
 
         return {"status": "success", "message": "Note updated successfully", "address": address, "note": note}
 
@@ -168,7 +181,7 @@ class WatchlistService:
         Returns:
             Import result summary
         """
-        added = 0
+        new_entries: Dict[str, Dict[str, Any]] = {}
         skipped = 0
 
         for entry in entries:
@@ -177,7 +190,7 @@ class WatchlistService:
                 skipped += 1
                 continue
 
-            if get_monitored_address(address):
+            if get_monitored_address(address) or address in new_entries:
                 skipped += 1
                 continue
 
@@ -190,10 +203,12 @@ class WatchlistService:
                 "note": entry.get("note"),
             }
 
-            set_monitored_address(address, address_data)
-            added += 1
+            new_entries[address] = address_data
 
-        self.save_addresses()
+        # One transaction for the whole batch
+        db.save_monitored_addresses(list(new_entries.values()))
+        monitored_addresses.update(new_entries)
+        added = len(new_entries)
 
         return {
             "status": "success",
@@ -211,8 +226,8 @@ class WatchlistService:
             Status dictionary
         """
         count = get_monitored_address_count()
+        db.clear_monitored_addresses()
         clear_monitored_addresses()
-        self.save_addresses()
 
         return {"status": "success", "message": f"Cleared {count} addresses", "total_monitored": 0}
 
@@ -11,6 +11,8 @@ import json
 import os
 from typing import Dict, Optional
 
+from app.utils.models import AnalysisSettings
+
 # ============================================================================
 # Directory Paths
 # ============================================================================
@@ -18,6 +20,7 @@ from typing import Dict, Optional
 SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATABASE_FILE = os.path.join(SCRIPT_DIR, "analyzed_tokens.db")
 SETTINGS_FILE = os.path.join(SCRIPT_DIR, "api_settings.json")
+# Pre-SQLite watchlist file, imported into the monitored_addresses table on first start
 DATA_FILE = os.path.join(SCRIPT_DIR, "monitored_addresses.json")
 ANALYSIS_RESULTS_DIR = os.path.join(SCRIPT_DIR, "analysis_results")
 AXIOM_EXPORTS_DIR = os.path.join(SCRIPT_DIR, "axiom_exports")
@@ -87,8 +90,27 @@ def load_api_settings() -> Dict:
     return DEFAULT_API_SETTINGS.copy()
 
 
+# Validated snapshot of CURRENT_API_SETTINGS; rebuilt lazily after the settings change
+_CACHED_ANALYSIS_SETTINGS: Optional[AnalysisSettings] = None
+
+
+def get_cached_analysis_settings() -> AnalysisSettings:
+    """Get AnalysisSettings for the current API settings, validating only once per change"""
+    global _CACHED_ANALYSIS_SETTINGS
+    if _CACHED_ANALYSIS_SETTINGS is None:
+        _CACHED_ANALYSIS_SETTINGS = AnalysisSettings(**CURRENT_API_SETTINGS)
+    return _CACHED_ANALYSIS_SETTINGS
+
+
+def invalidate_analysis_settings():
+    """Drop the cached AnalysisSettings after CURRENT_API_SETTINGS is modified"""
+    global _CACHED_ANALYSIS_SETTINGS
+    _CACHED_ANALYSIS_SETTINGS = None
+
+
 def save_api_settings(settings: Dict) -> bool:
     """Save API settings to file"""
+    invalidate_analysis_settings()
     try:
         with open(SETTINGS_FILE, "w") as f:
             json.dump(settings, f, indent=2)
@@ -4,10 +4,16 @@ Application state management
 Centralizes in-memory state stores:
 - Analysis job tracking
 - Monitored addresses (watchlist)
+- Shared HTTP client for external APIs
 """
 
+import asyncio
+import os
+import threading
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+import httpx
 
 # ============================================================================
 # Analysis Job Tracking
@@ -15,10 +21,127 @@ from typing import Any, Dict
 
 # In-memory job tracking (will be replaced with database or Redis in future)
 analysis_jobs: Dict[str, Dict[str, Any]] = {}
+# Jobs not yet completed (queued, processing or failed), oldest first, so listings skip the finished ones
+unfinished_analysis_jobs: Dict[str, Dict[str, Any]] = {}
+
+# Background thread pools by name, created on first use. shutdown_executors() drops them, so an
+# app started again in the same process (another TestClient, an embedded server) gets fresh ones.
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def _get_executor(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """Get the named thread pool, creating it if it does not exist (yet or anymore)"""
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            executor = _executors[name] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        return executor
+
+
+def get_analysis_executor() -> ThreadPoolExecutor:
+    """Thread pool for background analysis jobs, sized by ANALYSIS_THREADS"""
+    return _get_executor("analysis", int(os.environ.get("ANALYSIS_THREADS", 10)))
+
+
+def get_webhook_executor() -> ThreadPoolExecutor:
+    """Thread pool for Helius webhook management calls"""
+    return _get_executor("webhook", 5)
+
+
+def get_artifact_executor() -> ThreadPoolExecutor:
+    """Single writer thread for analysis artifact files, so analysis workers don't wait on disk"""
+    return _get_executor("artifact", 1)
+
+
+def get_activity_executor() -> ThreadPoolExecutor:
+    """Single writer thread for webhook activity, so callbacks return without waiting on SQLite"""
+    return _get_executor("activity", 1)
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """
+    Default executor of the app's event loop, used by run_in_executor(None, ...) for database calls
+
+    Kept apart from the analysis pool so minutes-long analyses can never starve request handlers.
+    """
+    return _get_executor("db", int(os.environ.get("DB_THREADS", 16)))
+
+
+def shutdown_executors():
+    """
+    Stop the background thread pools
+
+    Queued analyses and webhook tasks are dropped, running ones finish on their own,
+    and pending artifact and activity writes are flushed before returning.
+    """
+    with _executors_lock:
+        executors = dict(_executors)
+        _executors.clear()
+
+    for name, executor in executors.items():
+        if name in ("artifact", "activity"):
+            executor.shutdown(wait=True)
+        else:
+            executor.shutdown(wait=False, cancel_futures=name != "db")
 
-# Thread pool for background analysis jobs
-ANALYSIS_EXECUTOR = ThreadPoolExecutor(max_workers=10, thread_name_prefix="analysis")
-WEBHOOK_EXECUTOR = ThreadPoolExecutor(max_workers=5, thread_name_prefix="webhook")
+
+# Event loop serving the app, captured at startup so worker threads can schedule coroutines on it
+MAIN_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+def set_main_loop(loop: asyncio.AbstractEventLoop):
+    """
+    Record the application's event loop
+
+    Args:
+        loop: Running event loop of the app
+    """
+    global MAIN_LOOP
+    MAIN_LOOP = loop
+
+
+def get_main_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """
+    Get the application's event loop
+
+    Returns:
+        Event loop or None if the app has not started
+    """
+    return MAIN_LOOP
+
+
+# ============================================================================
+# HTTP Client with Connection Pooling (for external APIs)
+# ============================================================================
+
+# Shared async client so outbound API calls reuse keep-alive connections and TLS sessions
+HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get or create the shared HTTP client
+
+    Returns:
+        Pooled httpx.AsyncClient
+    """
+    global HTTP_CLIENT
+    if HTTP_CLIENT is None:
+        HTTP_CLIENT = httpx.AsyncClient(
+            # No pool timeout: requests beyond max_connections queue instead of failing
+            timeout=httpx.Timeout(10.0, pool=None),
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=100, keepalive_expiry=30.0),
+        )
+    return HTTP_CLIENT
+
+
+async def close_http_client():
+    """Close the shared HTTP client and its pooled connections"""
+    global HTTP_CLIENT
+    if HTTP_CLIENT is not None:
+        await HTTP_CLIENT.aclose()
+        HTTP_CLIENT = None
 
 
 def get_analysis_job(job_id: str) -> Dict[str, Any]:
@@ -43,6 +166,10 @@ def set_analysis_job(job_id: str, job_data: Dict[str, Any]):
         job_data: Job data dictionary
     """
     analysis_jobs[job_id] = job_data
+    if job_data.get("status") == "completed":
+        unfinished_analysis_jobs.pop(job_id, None)
+    else:
+        unfinished_analysis_jobs[job_id] = job_data
 
 
 def update_analysis_job(job_id: str, updates: Dict[str, Any]):
@@ -55,6 +182,8 @@ def update_analysis_job(job_id: str, updates: Dict[str, Any]):
     """
     if job_id in analysis_jobs:
         analysis_jobs[job_id].update(updates)
+        if updates.get("status") == "completed":
+            unfinished_analysis_jobs.pop(job_id, None)
 
 
 def get_all_analysis_jobs() -> Dict[str, Dict[str, Any]]:
@@ -67,11 +196,21 @@ def get_all_analysis_jobs() -> Dict[str, Dict[str, Any]]:
     return analysis_jobs
 
 
+def get_unfinished_analysis_jobs() -> Dict[str, Dict[str, Any]]:
+    """
+    Get analysis jobs that have not completed
+
+    Returns:
+        Dictionary of queued, processing and failed jobs in submission order
+    """
+    return unfinished_analysis_jobs
+
+
 # ============================================================================
 # Monitored Addresses (Watchlist)
 # ============================================================================
 
-# In-memory monitored addresses store (loaded from/saved to JSON)
+# In-memory copy of the monitored_addresses table, loaded at startup and written through on every change
 # Format: {address: {address, registered_at, threshold, total_notifications, last_notification, note}}
 monitored_addresses: Dict[str, Dict[str, Any]] = {}
 
@@ -76,7 +76,7 @@ class MessageResponse(BaseModel):
 class MultiTokenWallet(BaseModel):
     wallet_address: str
     token_count: int
-    token_names: List[str]
+    token_names: List[Optional[str]]
     token_addresses: List[str]
     token_ids: List[int]
     wallet_balance_usd: Optional[float]
@@ -4,9 +4,13 @@ Validation utilities for Gun Del Sol
 Provides common validation functions used across the application
 """
 
+import re
 from datetime import datetime
 from typing import Optional
 
+# 32-44 Base58 characters (no 0, O, I, l), checked in a single pass by the regex engine
+_SOLANA_ADDRESS = re.compile(r"[1-9A-HJ-NP-Za-km-z]{32,44}")
+
 
 def is_valid_solana_address(address: str) -> bool:
     """
@@ -20,11 +24,7 @@ def is_valid_solana_address(address: str) -> bool:
     """
     if not address or not isinstance(address, str):
         return False
-    if len(address) < 32 or len(address) > 44:
-        return False
-    # Base58 characters only (no 0, O, I, l)
-    base58 = set("123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz")
-    return all(ch in base58 for ch in address)
+    return _SOLANA_ADDRESS.fullmatch(address) is not None
 
 
 def format_timestamp(dt: Optional[datetime]) -> Optional[str]:
@@ -4,14 +4,20 @@ WebSocket connection management and real-time notifications
 Handles WebSocket connections for real-time analysis updates
 """
 
+import asyncio
 import logging
 from typing import Dict, List
 
+import orjson
 from fastapi import WebSocket, WebSocketDisconnect
 
 # Configure logging for WebSocket
 logger = logging.getLogger(__name__)
 
+# Clients that take longer than this to accept a broadcast are dropped so one slow
+# connection cannot hold up notifications for everyone else
+BROADCAST_SEND_TIMEOUT = 2.0
+
 
 class ConnectionManager:
     """Manages WebSocket connections for real-time notifications"""
@@ -48,18 +54,23 @@ class ConnectionManager:
         Args:
             message: Dictionary message to broadcast (will be sent as JSON)
         """
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-                logger.info(f"[WebSocket] Sent message to client: {message.get('event')}")
-            except Exception as e:
-                logger.error(f"[WebSocket] Error sending to client: {e}")
-                disconnected.append(connection)
-
-        # Remove disconnected clients
-        for connection in disconnected:
-            self.disconnect(connection)
+        if not self.active_connections:
+            return
+
+        # Serialize once and fan the same text frame out to every client concurrently
+        payload = orjson.dumps(message).decode()
+        connections = list(self.active_connections)
+        results = await asyncio.gather(
+            *(asyncio.wait_for(connection.send_text(payload), BROADCAST_SEND_TIMEOUT) for connection in connections),
+            return_exceptions=True,
+        )
+        logger.info(f"[WebSocket] Sent message to {len(connections)} client(s): {message.get('event')}")
+
+        # Remove disconnected or stalled clients
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                logger.error(f"[WebSocket] Error sending to client: {result!r}")
+                self.disconnect(connection)
 
     def get_connection_count(self) -> int:
         """
@@ -86,15 +86,16 @@ def test_client(test_db: str, monkeypatch) -> Generator[TestClient, None, None]:
     # Clear in-memory state
     state.monitored_addresses.clear()
     state.analysis_jobs.clear()
+    state.unfinished_analysis_jobs.clear()
 
     # Clear all router caches before each test
     from app.routers import tags, tokens, wallets
 
-    tokens.cache.cache.clear()
+    tokens.cache.clear()
     tokens.cache.pending_requests.clear()
-    tags.cache.cache.clear()
+    tags.cache.clear()
     tags.cache.pending_requests.clear()
-    wallets.cache.cache.clear()
+    wallets.cache.clear()
     wallets.cache.pending_requests.clear()
 
     # Create app and client
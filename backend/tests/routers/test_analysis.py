@@ -0,0 +1,71 @@
+"""
+Tests for analysis router
+
+Tests how finished analysis jobs are written out and reported
+"""
+
+import os
+
+import pytest
+
+import analyzed_tokens_db as db
+from app import state
+from app.routers.analysis import finish_analysis_job
+
+
+@pytest.mark.integration
+class TestFinishAnalysisJob:
+    """Test the artifact step that completes an analysis job"""
+
+    @pytest.fixture
+    def token_id(self, test_db: str, sample_token_data, sample_early_bidders) -> int:
+        """Save a token and queue a job for it"""
+        state.set_analysis_job("job-1", {"job_id": "job-1", "status": "processing", "result": None})
+        yield db.save_analyzed_token(
+            token_address=sample_token_data["token_address"],
+            token_name=sample_token_data["token_name"],
+            token_symbol=sample_token_data["token_symbol"],
+            acronym=sample_token_data["acronym"],
+            early_bidders=sample_early_bidders,
+            axiom_json=[],
+            credits_used=10,
+            max_wallets=10,
+        )
+        state.analysis_jobs.pop("job-1", None)
+        state.unfinished_analysis_jobs.pop("job-1", None)
+
+    def _finish(self, token_id: int, analysis_filepath: str, axiom_filepath: str):
+        finish_analysis_job(
+            "job-1",
+            token_id,
+            {"early_bidders": [], "api_credits_used": 10},
+            [],
+            analysis_filepath,
+            axiom_filepath,
+            {"job_id": "job-1", "wallets_found": 0, "token_id": token_id},
+        )
+
+    def test_completes_after_files_are_written(self, token_id: int, tmp_path):
+        """Test the job is completed with its paths recorded once both files exist"""
+        analysis_filepath = str(tmp_path / "results" / "1_test.json")
+        axiom_filepath = str(tmp_path / "axiom" / "1_tt.json")
+
+        self._finish(token_id, analysis_filepath, axiom_filepath)
+
+        assert state.get_analysis_job("job-1")["status"] == "completed"
+        assert os.path.exists(analysis_filepath) and os.path.exists(axiom_filepath)
+        assert db.get_token_details(token_id)["analysis_file_path"] == analysis_filepath
+
+    def test_failed_write_fails_job(self, token_id: int, tmp_path):
+        """Test a file that cannot be written fails the job without recording paths or leaving temp files"""
+        # A directory already sits where the axiom export should go, so replacing it fails
+        axiom_filepath = tmp_path / "axiom"
+        axiom_filepath.mkdir()
+
+        self._finish(token_id, str(tmp_path / "1_test.json"), str(axiom_filepath))
+
+        assert state.get_analysis_job("job-1")["status"] == "failed"
+        token = db.get_token_details(token_id)
+        assert token["analysis_file_path"] is None
+        assert token["axiom_file_path"] is None
+        assert not os.path.exists(f"{axiom_filepath}.tmp")
@@ -37,6 +37,17 @@ class TestHealthEndpoints:
         assert data["endpoints"] == 46
         assert "websocket_connections" in data
 
+    def test_app_restarts_in_same_process(self, test_client: TestClient):
+        """Test a second startup after shutdown gets working thread pools"""
+        from app.main import create_app
+
+        wallet = "DYw8jCTfwHNRJhhmFcbXvVDTqWMEVFBX6ZKUmG5CNSKK"
+        for attempt in range(2):
+            with TestClient(create_app()) as client:
+                # Runs on the event loop's default executor, which shutdown stops
+                response = client.post(f"/wallets/{wallet}/tags", json={"tag": f"tag-{attempt}"})
+                assert response.status_code == 200
+
 
 @pytest.mark.unit
 class TestDebugEndpoints:
@@ -100,6 +111,16 @@ class TestAPISettings:
         assert settings["walletCount"] == 20
         assert settings["minUsdFilter"] == 100.0
 
+    def test_update_refreshes_cached_analysis_settings(self, test_client: TestClient):
+        """Test the cached analysis settings snapshot follows a settings update"""
+        from app.settings import get_cached_analysis_settings
+
+        get_cached_analysis_settings()
+        response = test_client.post("/api/settings", json={"walletCount": 15})
+        assert response.status_code == 200
+
+        assert get_cached_analysis_settings().walletCount == 15
+
     def test_update_settings_with_invalid_values(self, test_client: TestClient):
         """Test updating settings with invalid values"""
         invalid_settings = {
@@ -155,3 +176,19 @@ class TestAPISettings:
         assert settings["apiRateDelay"] == 150
         assert settings["maxCreditsPerAnalysis"] == 1500
         assert settings["maxRetries"] == 5
+
+
+@pytest.mark.unit
+class TestNotifications:
+    """Test WebSocket notification broadcasts"""
+
+    def test_broadcast_reaches_websocket_client(self, test_client: TestClient):
+        """Test a notification posted over HTTP arrives as a JSON text frame"""
+        payload = {"job_id": "job-1", "token_name": "Test Token", "token_symbol": "TEST"}
+
+        with test_client.websocket_connect("/ws") as websocket:
+            response = test_client.post("/notify/analysis_start", json=payload)
+            assert response.status_code == 200
+            assert response.json()["connections"] == 1
+
+            assert websocket.receive_json() == {"event": "analysis_start", "data": payload}
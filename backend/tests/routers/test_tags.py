@@ -167,6 +167,40 @@ class TestCodex:
         wallet1_data = next(w for w in data["wallets"] if w["wallet_address"] == wallet1)
         assert len(wallet1_data["tags"]) == 2
 
+    def test_codex_not_modified(self, test_client: TestClient, test_db: str):
+        """Test the cached Codex honors If-None-Match until a tag changes"""
+        wallet = "DYw8jCTfwHNRJhhmFcbXvVDTqWMEVFBX6ZKUmG5CNSKK"
+        test_client.post(f"/wallets/{wallet}/tags", json={"tag": "whale", "is_kol": False})
+
+        etag = test_client.get("/codex").headers["ETag"]
+        response = test_client.get("/codex", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+        test_client.post(f"/wallets/{wallet}/tags", json={"tag": "insider", "is_kol": False})
+        response = test_client.get("/codex", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert len(response.json()["wallets"][0]["tags"]) == 2
+
+    def test_tags_not_modified(self, test_client: TestClient, test_db: str):
+        """Test the cached tag list honors If-None-Match until a tag is added or removed"""
+        wallet = "DYw8jCTfwHNRJhhmFcbXvVDTqWMEVFBX6ZKUmG5CNSKK"
+        test_client.post(f"/wallets/{wallet}/tags", json={"tag": "whale", "is_kol": False})
+
+        etag = test_client.get("/tags").headers["ETag"]
+        response = test_client.get("/tags", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+        test_client.post(f"/wallets/{wallet}/tags", json={"tag": "insider", "is_kol": False})
+        response = test_client.get("/tags", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert sorted(response.json()["tags"]) == ["insider", "whale"]
+        etag = response.headers["ETag"]
+
+        test_client.request("DELETE", f"/wallets/{wallet}/tags", json={"tag": "insider"})
+        response = test_client.get("/tags", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["tags"] == ["whale"]
+
     def test_batch_get_wallet_tags(self, test_client: TestClient, test_db: str):
         """Test getting tags for multiple wallets in one request"""
         wallets = ["DYw8jCTfwHNRJhhmFcbXvVDTqWMEVFBX6ZKUmG5CNSKK", "7xLk17EQQ5KLDLDe44wCmupJKJjTGd8hs3eSVVhCx6ku"]
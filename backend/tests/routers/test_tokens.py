@@ -4,6 +4,8 @@ Tests for tokens router
 Tests token CRUD operations, trash management, and history tracking
 """
 
+import os
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -101,6 +103,80 @@ class TestTokenDetails:
         assert "axiom_json" in data
         assert len(data["wallets"]) == len(sample_early_bidders)
 
+    def test_get_token_by_id_not_modified(
+        self, test_client: TestClient, test_db: str, sample_token_data, sample_early_bidders
+    ):
+        """Test token details honor If-None-Match until the token is re-analyzed"""
+        save_kwargs = dict(
+            token_address=sample_token_data["token_address"],
+            token_name=sample_token_data["token_name"],
+            token_symbol=sample_token_data["token_symbol"],
+            acronym=sample_token_data["acronym"],
+            early_bidders=sample_early_bidders,
+            axiom_json=[{"wallet": "first"}],
+        )
+        token_id = db.save_analyzed_token(**save_kwargs)
+
+        response = test_client.get(f"/api/tokens/{token_id}")
+        etag = response.headers["ETag"]
+        assert response.json()["axiom_json"] == [{"wallet": "first"}]
+
+        response = test_client.get(f"/api/tokens/{token_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+        # A re-analysis, even within the same second, refreshes both the export and the ETag
+        db.save_analyzed_token(**{**save_kwargs, "axiom_json": [{"wallet": "second"}]})
+
+        response = test_client.get(f"/api/tokens/{token_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["axiom_json"] == [{"wallet": "second"}]
+
+    def test_get_token_by_id_lists_every_run(
+        self, test_client: TestClient, test_db: str, sample_token_data, sample_early_bidders
+    ):
+        """Test token details list the wallets of every run in first-buy order"""
+        save_kwargs = dict(
+            token_address=sample_token_data["token_address"],
+            token_name=sample_token_data["token_name"],
+            token_symbol=sample_token_data["token_symbol"],
+            acronym=sample_token_data["acronym"],
+            axiom_json=[],
+        )
+        token_id = db.save_analyzed_token(early_bidders=sample_early_bidders, **save_kwargs)
+
+        # The re-analysis finds one new wallet that bought before the others
+        earlier_bidder = {
+            **sample_early_bidders[0],
+            "wallet_address": "9WzDXwBbmkg8ZTbNMqUxvQRAyrZzDsGYdLVL9zYtAWWM",
+            "first_buy_time": "2024-01-15T09:00:00",
+        }
+        db.save_analyzed_token(early_bidders=[earlier_bidder], **save_kwargs)
+
+        response = test_client.get(f"/api/tokens/{token_id}")
+        assert response.status_code == 200
+
+        wallets = response.json()["wallets"]
+        assert [w["wallet_address"] for w in wallets] == [
+            earlier_bidder["wallet_address"],
+            sample_early_bidders[0]["wallet_address"],
+            sample_early_bidders[1]["wallet_address"],
+        ]
+
+    def test_get_deleted_token(self, test_client: TestClient, test_db: str, sample_token_data, sample_early_bidders):
+        """Test a token in the trash is not found"""
+        token_id = db.save_analyzed_token(
+            token_address=sample_token_data["token_address"],
+            token_name=sample_token_data["token_name"],
+            token_symbol=sample_token_data["token_symbol"],
+            acronym=sample_token_data["acronym"],
+            early_bidders=sample_early_bidders,
+            axiom_json=[],
+        )
+        test_client.delete(f"/api/tokens/{token_id}")
+
+        response = test_client.get(f"/api/tokens/{token_id}")
+        assert response.status_code == 404
+
     def test_get_nonexistent_token(self, test_client: TestClient, test_db: str):
         """Test getting token that doesn't exist"""
         response = test_client.get("/api/tokens/99999")
@@ -130,6 +206,11 @@ class TestTokenDetails:
         assert "runs" in data
         assert data["total_runs"] >= 1
 
+    def test_get_nonexistent_token_analysis_history(self, test_client: TestClient, test_db: str):
+        """Test getting analysis history for a non-existent token"""
+        response = test_client.get("/api/tokens/99999/history")
+        assert response.status_code == 404
+
 
 @pytest.mark.integration
 class TestTokenTrash:
@@ -236,3 +317,34 @@ class TestTokenTrash:
         data = response.json()
         token_ids = [t["id"] for t in data["tokens"]]
         assert token_id not in token_ids
+
+    def test_soft_delete_only_sets_deleted_at(
+        self, test_client: TestClient, test_db: str, sample_token_data, sample_early_bidders, tmp_path, monkeypatch
+    ):
+        """Test the trash routes only set and clear deleted_at, leaving is_deleted and the files alone"""
+        monkeypatch.setattr(db, "_ANALYSIS_TRASH_PREFIX", os.path.join(tmp_path, "trash", ""))
+        token_id = db.save_analyzed_token(
+            token_address=sample_token_data["token_address"],
+            token_name=sample_token_data["token_name"],
+            token_symbol=sample_token_data["token_symbol"],
+            acronym=sample_token_data["acronym"],
+            early_bidders=sample_early_bidders,
+            axiom_json=[],
+        )
+        analysis_filepath = tmp_path / "1_test.json"
+        analysis_filepath.write_text("{}")
+        db.update_token_file_paths(token_id, str(analysis_filepath), None)
+
+        test_client.delete(f"/api/tokens/{token_id}")
+
+        token = db.get_token_details(token_id)
+        assert token["deleted_at"] is not None
+        assert not token["is_deleted"]
+        assert token["analysis_file_path"] == str(analysis_filepath)
+        assert analysis_filepath.exists()
+
+        test_client.post(f"/api/tokens/{token_id}/restore")
+
+        token = db.get_token_details(token_id)
+        assert token["deleted_at"] is None
+        assert not token["is_deleted"]
@@ -4,7 +4,7 @@ Tests for wallets router
 Tests multi-token wallet queries and balance refresh
 """
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
@@ -97,12 +97,23 @@ class TestMultiTokenWallets:
         # Results should be identical
         assert response1.json() == response2.json()
 
+    def test_multi_token_wallets_not_modified(self, test_client: TestClient, test_db: str):
+        """Test the cached listing honors If-None-Match"""
+        etag = test_client.get("/multi-token-wallets?min_tokens=2").headers["ETag"]
+
+        response = test_client.get("/multi-token-wallets?min_tokens=2", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+        response = test_client.get("/multi-token-wallets?min_tokens=3", headers={"If-None-Match": "stale"})
+        assert response.status_code == 200
+        assert response.json() == {"total": 0, "wallets": []}
+
 
 @pytest.mark.integration
 class TestBalanceRefresh:
     """Test wallet balance refresh functionality"""
 
-    @patch("requests.get")
+    @patch("httpx.AsyncClient.get", new_callable=AsyncMock)
     def test_refresh_wallet_balances(self, mock_get, test_client: TestClient):
         """Test refreshing wallet balances"""
         # Mock Helius API response
@@ -128,7 +139,7 @@ class TestBalanceRefresh:
         response = test_client.post("/wallets/refresh-balances", json=payload)
         assert response.status_code == 422  # Validation error (min_items=1)
 
-    @patch("requests.get")
+    @patch("httpx.AsyncClient.get", new_callable=AsyncMock)
     def test_refresh_multiple_balances(self, mock_get, test_client: TestClient):
         """Test refreshing multiple wallet balances"""
         mock_response = MagicMock()
@@ -149,3 +160,29 @@ class TestBalanceRefresh:
         data = response.json()
         assert data["total_wallets"] == 2
         assert len(data["results"]) == 2
+
+    @patch("httpx.AsyncClient.get", new_callable=AsyncMock)
+    def test_refresh_updates_stored_balance(self, mock_get, test_client: TestClient, sample_early_bidders):
+        """Test refreshed balances are written to every row for the wallet"""
+        wallet_address = sample_early_bidders[0]["wallet_address"]
+        token_id = db.save_analyzed_token(
+            token_address="Token1Address1234567890123456789012345",
+            token_name="Token 1",
+            token_symbol="TK1",
+            acronym="TK1",
+            early_bidders=sample_early_bidders[:1],
+            axiom_json=[],
+            credits_used=50,
+            max_wallets=10,
+        )
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"nativeBalance": 2000000}
+        mock_get.return_value = mock_response
+
+        response = test_client.post("/wallets/refresh-balances", json={"wallet_addresses": [wallet_address]})
+        assert response.status_code == 200
+
+        wallets = db.get_token_details(token_id)["wallets"]
+        assert wallets[0]["wallet_balance_usd"] == 2000.0
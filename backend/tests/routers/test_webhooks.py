@@ -0,0 +1,105 @@
+"""
+Tests for webhooks router
+
+Tests Helius webhook callback ingestion
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+import analyzed_tokens_db as db
+from app.routers import webhooks
+from app.state import get_activity_executor
+
+
+@pytest.mark.integration
+class TestWebhookCallback:
+    """Test webhook callback processing"""
+
+    @pytest.fixture
+    def tracked_wallets(self, test_db: str, sample_token_data, sample_early_bidders):
+        """Save a token so its early bidders are tracked"""
+        db.save_analyzed_token(
+            token_address=sample_token_data["token_address"],
+            token_name=sample_token_data["token_name"],
+            token_symbol=sample_token_data["token_symbol"],
+            acronym=sample_token_data["acronym"],
+            early_bidders=sample_early_bidders,
+            axiom_json=[],
+            credits_used=10,
+            max_wallets=10,
+        )
+        return [bidder["wallet_address"] for bidder in sample_early_bidders]
+
+    def test_callback_saves_transfers(self, test_client: TestClient, tracked_wallets):
+        """Test native and token transfers from tracked wallets are saved"""
+        payload = [
+            {
+                "signature": "sig-native",
+                "timestamp": 1705312800,
+                "type": "TRANSFER",
+                "description": "Sent SOL",
+                "nativeTransfers": [
+                    {"fromUserAccount": tracked_wallets[0], "toUserAccount": "Recipient1", "amount": 2_500_000_000}
+                ],
+                "tokenTransfers": [],
+            },
+            {
+                "signature": "sig-token",
+                "timestamp": 1705312900,
+                "type": "SWAP",
+                "description": "Swapped tokens",
+                "nativeTransfers": [],
+                "tokenTransfers": [
+                    {"fromUserAccount": tracked_wallets[1], "toUserAccount": "Recipient2", "tokenAmount": 42.5},
+                    {"fromUserAccount": "UntrackedWallet", "toUserAccount": "Recipient3", "tokenAmount": 1},
+                ],
+            },
+        ]
+
+        response = test_client.post("/webhooks/callback", json=payload)
+        assert response.status_code == 200
+        assert response.json() == {"status": "success", "processed": 2}
+
+        # Writes run in order on the single activity thread, so this waits for the delivery
+        get_activity_executor().submit(lambda: None).result()
+
+        activity = {a["transaction_signature"]: a for a in db.get_recent_activity()}
+        assert set(activity) == {"sig-native", "sig-token"}
+        assert activity["sig-native"]["sol_amount"] == 2.5
+        assert activity["sig-native"]["timestamp"] == "2024-01-15T10:00:00"
+        assert activity["sig-token"]["token_amount"] == 42.5
+        assert activity["sig-token"]["recipient_address"] == "Recipient2"
+
+    def test_callback_invalid_json(self, test_client: TestClient):
+        """Test a malformed payload is rejected"""
+        response = test_client.post(
+            "/webhooks/callback", content="not json", headers={"Content-Type": "application/json"}
+        )
+        assert response.status_code == 400
+
+    def test_callback_releases_permit_when_writer_is_down(self, test_client: TestClient, tracked_wallets, monkeypatch):
+        """Test a delivery refused by a shut-down writer gets a 503 and frees its queue slot"""
+        payload = [
+            {
+                "signature": "sig-native",
+                "timestamp": 1705312800,
+                "nativeTransfers": [{"fromUserAccount": tracked_wallets[0], "amount": 1_000_000_000}],
+            }
+        ]
+        stopped_executor = ThreadPoolExecutor(max_workers=1)
+        stopped_executor.shutdown()
+        monkeypatch.setattr(webhooks, "_pending_activity_writes", threading.BoundedSemaphore(1))
+        monkeypatch.setattr(webhooks, "get_activity_executor", lambda: stopped_executor)
+
+        response = test_client.post("/webhooks/callback", json=payload)
+        assert response.status_code == 503
+
+        # The single permit was handed back, so the next delivery is accepted
+        monkeypatch.setattr(webhooks, "get_activity_executor", get_activity_executor)
+        response = test_client.post("/webhooks/callback", json=payload)
+        assert response.status_code == 200
+        get_activity_executor().submit(lambda: None).result()
@@ -32,7 +32,7 @@ class TestWatchlistService:
             os.unlink(temp_file)
 
     @pytest.fixture
-    def watchlist_service(self, temp_data_file, monkeypatch):
+    def watchlist_service(self, test_db, temp_data_file, monkeypatch):
         """Create a watchlist service with temporary data file"""
         from app import settings
 
@@ -167,19 +167,39 @@ class TestWatchlistService:
         list_result = watchlist_service.list_addresses()
         assert list_result["total"] == 0
 
-    def test_persistence(self, watchlist_service, temp_data_file):
-        """Test that data persists to file"""
+    def test_persistence(self, watchlist_service):
+        """Test that data persists to the database"""
         address = "DYw8jCTfwHNRJhhmFcbXvVDTqWMEVFBX6ZKUmG5CNSKK"
         watchlist_service.register_address(address, note="Persistent wallet")
+        watchlist_service.update_note(address, "Updated note")
 
-        # Verify data was saved to file
-        with open(temp_data_file, "r") as f:
-            data = json.load(f)
+        # A fresh service reloads the watchlist from the database
+        state.monitored_addresses.clear()
+        reloaded = WatchlistService()
+
+        assert reloaded.get_address(address)["note"] == "Updated note"
+        assert reloaded.list_addresses()["total"] == 1
+
+    def test_migrates_json_file(self, test_db, temp_data_file, monkeypatch):
+        """Test that addresses from the old JSON file are imported once"""
+        from app import settings
+
+        address = "DYw8jCTfwHNRJhhmFcbXvVDTqWMEVFBX6ZKUmG5CNSKK"
+        with open(temp_data_file, "w") as f:
+            json.dump({address: {"address": address, "threshold": 100, "note": "Old wallet"}}, f)
+        monkeypatch.setattr(settings, "DATA_FILE", temp_data_file)
+        state.monitored_addresses.clear()
+
+        service = WatchlistService()
+        assert service.get_address(address)["note"] == "Old wallet"
+        assert not os.path.exists(temp_data_file)
+        os.unlink(temp_data_file + ".migrated")
 
-        assert address in data
-        assert data[address]["note"] == "Persistent wallet"
+        # Clearing must not bring the file's addresses back on the next start
+        service.clear_all()
+        assert WatchlistService().list_addresses()["total"] == 0
 
-    def test_get_watchlist_service_singleton(self):
+    def test_get_watchlist_service_singleton(self, test_db):
         """Test that get_watchlist_service returns singleton"""
         service1 = get_watchlist_service()
         service2 = get_watchlist_service()
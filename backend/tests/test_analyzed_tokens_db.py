@@ -0,0 +1,449 @@
+"""
+Tests for analyzed_tokens_db
+
+Tests database helpers that are not exercised through the routers
+"""
+
+import os
+
+import pytest
+
+import analyzed_tokens_db as db
+
+
+def _save_token(token_address: str, token_name: str, token_symbol: str, acronym: str, early_bidders: list) -> int:
+    return db.save_analyzed_token(
+        token_address=token_address,
+        token_name=token_name,
+        token_symbol=token_symbol,
+        acronym=acronym,
+        early_bidders=early_bidders,
+        axiom_json=[],
+        credits_used=10,
+        max_wallets=10,
+    )
+
+
+class TestSanitizeFilename:
+    """Test filename sanitization"""
+
+    @pytest.mark.parametrize(
+        "text,expected",
+        [
+            ("Eugene The Meme", "eugene-the-meme"),
+            ("  $WIF -- hat_coin!  ", "wif-hatcoin"),
+            ("Café 日本", "café-日本"),
+            ("---", ""),
+        ],
+    )
+    def test_sanitize(self, text: str, expected: str):
+        """Test unsafe characters are dropped and hyphens collapsed"""
+        assert db.sanitize_filename(text) == expected
+
+    def test_truncate_does_not_end_with_hyphen(self):
+        """Test truncation trims a trailing hyphen"""
+        assert db.sanitize_filename("abcd efgh", max_length=5) == "abcd"
+
+
+@pytest.mark.integration
+class TestSearchTokens:
+    """Test token search by token fields and wallet address"""
+
+    @pytest.fixture
+    def token_id(self, test_db: str, sample_token_data, sample_early_bidders) -> int:
+        return _save_token(
+            sample_token_data["token_address"],
+            sample_token_data["token_name"],
+            sample_token_data["token_symbol"],
+            sample_token_data["acronym"],
+            sample_early_bidders,
+        )
+
+    def test_search_by_name_case_insensitive(self, token_id: int):
+        """Test substring search on token name ignores case"""
+        results = db.search_tokens("st tok")
+        assert [t["id"] for t in results] == [token_id]
+
+    def test_search_by_wallet_address(self, token_id: int, sample_early_bidders):
+        """Test search matches tokens through their early buyer wallets"""
+        results = db.search_tokens(sample_early_bidders[1]["wallet_address"][5:20])
+        assert [t["id"] for t in results] == [token_id]
+
+    def test_search_short_query(self, token_id: int):
+        """Test queries shorter than the trigram length still match"""
+        results = db.search_tokens("tt")
+        assert [t["id"] for t in results] == [token_id]
+
+    def test_search_wildcards_are_literal(self, token_id: int):
+        """Test LIKE wildcards in short queries are not treated as patterns"""
+        assert db.search_tokens("%") == []
+        assert db.search_tokens("_") == []
+
+    def test_search_no_match(self, token_id: int):
+        """Test search returns nothing for unknown text"""
+        assert db.search_tokens("does-not-exist") == []
+
+    def test_search_reflects_renamed_token(self, token_id: int, sample_token_data, sample_early_bidders):
+        """Test the search index follows token updates"""
+        _save_token(sample_token_data["token_address"], "Renamed Coin", "RNC", "RC", sample_early_bidders)
+
+        assert db.search_tokens("Test Token") == []
+        assert [t["id"] for t in db.search_tokens("renamed")] == [token_id]
+
+
+@pytest.mark.integration
+class TestMultiTokenWallets:
+    """Test cross-token wallet aggregation"""
+
+    def test_tokens_grouped_per_wallet(self, test_db: str, sample_early_bidders):
+        """Test each shared wallet lists every token it bought, including names with commas"""
+        first_id = _save_token("Token1Address1234567890123456789012345", "Cats, Dogs", "CD", "CD", sample_early_bidders)
+        second_id = _save_token(
+            "Token2Address1234567890123456789012345", "Frogs", "FRG", "FRG", sample_early_bidders[:1]
+        )
+
+        wallets = db.get_multi_token_wallets(min_tokens=2)
+
+        assert len(wallets) == 1
+        wallet = wallets[0]
+        assert wallet["wallet_address"] == sample_early_bidders[0]["wallet_address"]
+        assert wallet["token_count"] == 2
+        assert wallet["token_ids"] == [first_id, second_id]
+        assert wallet["token_names"] == ["Cats, Dogs (CD)", "Frogs (FRG)"]
+        assert wallet["wallet_balance_usd"] == sample_early_bidders[0]["wallet_balance_usd"]
+
+    def test_listing_keeps_token_fields_aligned(self, test_db: str, sample_early_bidders):
+        """Test the /multi-token-wallets listing keeps names with commas and pairs them with their tokens"""
+        first_id = _save_token("Token1Address1234567890123456789012345", "Cats, Dogs", "CD", "CD", sample_early_bidders)
+        second_id = _save_token(
+            "Token2Address1234567890123456789012345", "Frogs", "FRG", "FRG", sample_early_bidders[:1]
+        )
+
+        [wallet] = db.get_multi_early_buyer_wallets(min_tokens=2)
+
+        tokens = sorted(zip(wallet["token_ids"], wallet["token_names"], wallet["token_addresses"]))
+        assert tokens == [
+            (first_id, "Cats, Dogs", "Token1Address1234567890123456789012345"),
+            (second_id, "Frogs", "Token2Address1234567890123456789012345"),
+        ]
+        assert wallet["token_count"] == 2
+
+    def test_listing_keeps_unnamed_tokens_aligned(self, test_db: str, sample_early_bidders):
+        """Test a token without a name keeps its place in the names list"""
+        first_id = _save_token("Token1Address1234567890123456789012345", None, "ONE", "ONE", sample_early_bidders)
+        second_id = _save_token("Token2Address1234567890123456789012345", "Two", "TWO", "TWO", sample_early_bidders)
+
+        [wallet] = db.get_multi_early_buyer_wallets(min_tokens=2)[:1]
+
+        tokens = sorted(zip(wallet["token_ids"], wallet["token_names"]))
+        assert tokens == [(first_id, None), (second_id, "Two")]
+
+    def test_balance_from_latest_run(self, test_db: str, sample_early_bidders):
+        """Test the reported balance comes from the most recent run that recorded one"""
+        wallet = dict(sample_early_bidders[0])
+        first_id = _save_token("Token1Address1234567890123456789012345", "One", "ONE", "ONE", [wallet])
+        second_id = _save_token(
+            "Token2Address1234567890123456789012345", "Two", "TWO", "TWO", [{**wallet, "wallet_balance_usd": 42.0}]
+        )
+        with db.get_db_connection() as conn:
+            conn.execute("UPDATE analysis_runs SET analysis_timestamp = '2024-01-02' WHERE token_id = ?", (first_id,))
+            conn.execute("UPDATE analysis_runs SET analysis_timestamp = '2024-01-01' WHERE token_id = ?", (second_id,))
+
+        wallets = db.get_multi_token_wallets(min_tokens=2)
+
+        assert [w["wallet_balance_usd"] for w in wallets] == [wallet["wallet_balance_usd"]]
+
+
+@pytest.mark.integration
+class TestAnalyzedTokens:
+    """Test the token list with per-token wallet addresses"""
+
+    def test_wallet_addresses_per_token(self, test_db: str, sample_early_bidders):
+        """Test each token lists its own wallets and tokens without wallets are kept"""
+        first_id = _save_token("Token1Address1234567890123456789012345", "One", "ONE", "ONE", sample_early_bidders)
+        second_id = _save_token("Token2Address1234567890123456789012345", "Two", "TWO", "TWO", [])
+
+        tokens = {t["id"]: t for t in db.get_analyzed_tokens()}
+
+        assert tokens[first_id]["wallet_addresses"] == [w["wallet_address"] for w in sample_early_bidders]
+        assert tokens[first_id]["token_name"] == "One"
+        assert tokens[second_id]["wallet_addresses"] == []
+
+    def test_deleted_tokens_excluded(self, test_db: str, sample_early_bidders):
+        """Test soft-deleted tokens only appear when requested"""
+        token_id = _save_token("Token1Address1234567890123456789012345", "One", "ONE", "ONE", sample_early_bidders)
+        db.soft_delete_token(token_id)
+
+        assert db.get_analyzed_tokens() == []
+        assert [t["id"] for t in db.get_analyzed_tokens(include_deleted=True)] == [token_id]
+
+    def test_history_counts_distinct_wallets_across_runs(self, test_db: str, sample_early_bidders):
+        """Test the history wallet count includes each early buyer once over all runs"""
+        address = "Token1Address1234567890123456789012345"
+        _save_token(address, "One", "ONE", "ONE", sample_early_bidders[:2])
+        _save_token(address, "One", "ONE", "ONE", sample_early_bidders[1:])
+
+        [token] = db.get_tokens_history()
+
+        assert token["wallets_found"] == len(sample_early_bidders)
+
+    def test_trash_counts_distinct_wallets_across_runs(self, test_db: str, sample_early_bidders):
+        """Test a deleted token reports the same wallet count as it did in the history"""
+        address = "Token1Address1234567890123456789012345"
+        _save_token(address, "One", "ONE", "ONE", sample_early_bidders[:2])
+        token_id = _save_token(address, "One", "ONE", "ONE", sample_early_bidders[1:])
+
+        db.soft_delete_token(token_id)
+        [token] = db.get_deleted_tokens()
+
+        assert token["wallets_found"] == len(sample_early_bidders)
+
+
+@pytest.mark.integration
+class TestWriterTransactions:
+    """Test nested writer blocks share one transaction"""
+
+    def test_nested_block_does_not_commit_early(self, test_db: str):
+        """Test an inner block's exit leaves the outer transaction open to roll back"""
+        with pytest.raises(RuntimeError):
+            with db.get_db_connection() as conn:
+                conn.execute("INSERT INTO wallet_tags (wallet_address, tag) VALUES ('outer', 'a')")
+                with db.get_db_connection() as inner:
+                    inner.execute("INSERT INTO wallet_tags (wallet_address, tag) VALUES ('inner', 'a')")
+                raise RuntimeError("fail after the inner block")
+
+        assert db.get_all_tagged_wallets() == []
+
+    def test_soft_delete_rolls_back_with_outer_block(self, test_db: str, sample_early_bidders):
+        """Test soft_delete_token's trash helper leaves the delete to the outer transaction"""
+        token_id = _save_token("Token1Address1234567890123456789012345", "One", "ONE", "ONE", sample_early_bidders)
+
+        with pytest.raises(RuntimeError):
+            with db.get_db_connection():
+                assert db.soft_delete_token(token_id)
+                raise RuntimeError("fail after the soft delete")
+
+        assert db.get_deleted_tokens() == []
+
+        db.soft_delete_token(token_id)
+        with pytest.raises(RuntimeError):
+            with db.get_db_connection():
+                assert db.restore_token(token_id)
+                raise RuntimeError("fail after the restore")
+
+        assert [token["id"] for token in db.get_deleted_tokens()] == [token_id]
+
+
+@pytest.mark.integration
+class TestTokenDetails:
+    """Test token detail retrieval"""
+
+    def test_axiom_json_round_trip(self, test_db: str, sample_token_data, sample_early_bidders):
+        """Test the axiom export is stored as a blob and decoded back to a list"""
+        axiom = [{"trackedWalletAddress": sample_early_bidders[0]["wallet_address"], "name": "(1/10)$500.0|TT"}]
+        token_id = db.save_analyzed_token(
+            token_address=sample_token_data["token_address"],
+            token_name=sample_token_data["token_name"],
+            token_symbol=sample_token_data["token_symbol"],
+            acronym=sample_token_data["acronym"],
+            early_bidders=sample_early_bidders,
+            axiom_json=axiom,
+            credits_used=10,
+            max_wallets=10,
+        )
+
+        assert db.get_token_details(token_id)["axiom_json"] == axiom
+
+    def test_wallets_from_latest_run(self, test_db: str, sample_token_data, sample_early_bidders):
+        """Test re-analysis replaces the wallet list rather than appending to it"""
+        args = (sample_token_data["token_address"], "Test Token", "TT", "TT")
+        _save_token(*args, sample_early_bidders)
+        token_id = _save_token(*args, sample_early_bidders[:1])
+
+        wallets = db.get_token_details(token_id)["wallets"]
+
+        assert [w["wallet_address"] for w in wallets] == [sample_early_bidders[0]["wallet_address"]]
+
+
+@pytest.mark.integration
+class TestDuplicateWrites:
+    """Test duplicate inserts are reported instead of raised"""
+
+    def test_duplicate_wallet_activity(self, test_db: str, sample_token_data, sample_early_bidders):
+        """Test a repeated transaction signature is only stored once"""
+        _save_token(
+            sample_token_data["token_address"],
+            sample_token_data["token_name"],
+            sample_token_data["token_symbol"],
+            sample_token_data["acronym"],
+            sample_early_bidders,
+        )
+        activity = {
+            "wallet_address": sample_early_bidders[0]["wallet_address"],
+            "transaction_signature": "sig1",
+            "timestamp": "2024-01-01T00:00:00",
+            "activity_type": "transfer",
+            "description": "Sent SOL",
+        }
+
+        assert db.save_wallet_activity(**activity) is True
+        assert db.save_wallet_activity(**activity) is False
+        assert db.save_wallet_activity(**{**activity, "wallet_address": "UntrackedWallet"}) is False
+        assert len(db.get_recent_activity()) == 1
+
+    def test_bulk_wallet_activity(self, test_db: str, sample_token_data, sample_early_bidders):
+        """Test batch inserts skip untracked wallets and repeated signatures"""
+        _save_token(
+            sample_token_data["token_address"],
+            sample_token_data["token_name"],
+            sample_token_data["token_symbol"],
+            sample_token_data["acronym"],
+            sample_early_bidders,
+        )
+        base = {"timestamp": "2024-01-01T00:00:00", "activity_type": "transfer", "description": "Sent SOL"}
+        events = [
+            {**base, "wallet_address": sample_early_bidders[0]["wallet_address"], "transaction_signature": "sig1"},
+            {**base, "wallet_address": sample_early_bidders[1]["wallet_address"], "transaction_signature": "sig2"},
+            {**base, "wallet_address": sample_early_bidders[0]["wallet_address"], "transaction_signature": "sig1"},
+            {**base, "wallet_address": "UntrackedWallet", "transaction_signature": "sig3"},
+        ]
+
+        assert db.save_wallet_activities(events) == 2
+        assert db.save_wallet_activities([]) == 0
+        assert len(db.get_recent_activity()) == 2
+
+    def test_duplicate_wallet_tag(self, test_db: str):
+        """Test adding the same tag twice reports the second insert as a no-op"""
+        assert db.add_wallet_tag("Wallet1", "whale") is True
+        assert db.add_wallet_tag("Wallet1", "whale") is False
+        assert db.get_wallet_tags("Wallet1") == [{"tag": "whale", "is_kol": False}]
+
+    def test_bulk_wallet_tags(self, test_db: str):
+        """Test bulk tagging counts only tags that were not already present"""
+        db.add_wallet_tag("Wallet1", "whale")
+
+        added = db.add_wallet_tags_bulk(
+            [("Wallet1", "whale", False), ("Wallet1", "kol", True), ("Wallet2", "whale", False)]
+        )
+
+        assert added == 2
+        tags = db.get_multi_wallet_tags(["Wallet1", "Wallet2"])
+        assert sorted(tags["Wallet1"], key=lambda t: t["tag"]) == [
+            {"tag": "kol", "is_kol": True},
+            {"tag": "whale", "is_kol": False},
+        ]
+        assert tags["Wallet2"] == [{"tag": "whale", "is_kol": False}]
+
+
+@pytest.mark.integration
+class TestWalletBalances:
+    """Test wallet balance updates"""
+
+    def test_update_wallet_balance(self, test_db: str, sample_token_data, sample_early_bidders):
+        """Test balances update every row for the wallet and report unknown wallets"""
+        token_id = _save_token(
+            sample_token_data["token_address"],
+            sample_token_data["token_name"],
+            sample_token_data["token_symbol"],
+            sample_token_data["acronym"],
+            sample_early_bidders,
+        )
+        wallet_address = sample_early_bidders[0]["wallet_address"]
+
+        assert db.update_wallet_balance(wallet_address, 1234.5) is True
+        assert db.update_wallet_balance("UntrackedWallet", 1.0) is False
+
+        wallets = {w["wallet_address"]: w for w in db.get_token_details(token_id)["wallets"]}
+        assert wallets[wallet_address]["wallet_balance_usd"] == 1234.5
+
+
+@pytest.mark.integration
+class TestTaggedWallets:
+    """Test the Codex listing of tagged wallets"""
+
+    def test_tags_grouped_per_wallet(self, test_db: str):
+        """Test every tagged wallet appears once with all of its tags"""
+        db.add_wallet_tag("Wallet1", "whale")
+        db.add_wallet_tag("Wallet2", "kol", is_kol=True)
+        db.add_wallet_tag("Wallet1", "sniper")
+
+        wallets = {w["wallet_address"]: w["tags"] for w in db.get_all_tagged_wallets()}
+
+        assert set(wallets) == {"Wallet1", "Wallet2"}
+        assert sorted(t["tag"] for t in wallets["Wallet1"]) == ["sniper", "whale"]
+        assert wallets["Wallet2"] == [{"tag": "kol", "is_kol": True}]
+
+
+@pytest.mark.integration
+class TestPermanentDelete:
+    """Test permanent deletion of a token and its dependent rows"""
+
+    def test_runs_and_wallets_cascade(self, test_db: str, sample_early_bidders):
+        """Test the single token DELETE also removes its analysis runs and wallets"""
+        token_id = _save_token("Token1Address1234567890123456789012345", "One", "ONE", "ONE", sample_early_bidders)
+
+        assert db.permanent_delete_token(token_id) is True
+
+        with db.get_db_connection(readonly=True) as conn:
+            runs = conn.execute("SELECT COUNT(*) FROM analysis_runs WHERE token_id = ?", (token_id,)).fetchone()[0]
+            wallets = conn.execute(
+                "SELECT COUNT(*) FROM early_buyer_wallets WHERE token_id = ?", (token_id,)
+            ).fetchone()[0]
+        assert (runs, wallets) == (0, 0)
+        assert db.token_exists(token_id) is False
+
+
+@pytest.mark.integration
+class TestTokenFiles:
+    """Test moving token result files in and out of trash"""
+
+    @pytest.fixture
+    def token_id(self, test_db: str, tmp_path, monkeypatch, sample_token_data, sample_early_bidders) -> int:
+        for name, path in [
+            ("_ANALYSIS_PREFIX", ("analysis_results",)),
+            ("_ANALYSIS_TRASH_PREFIX", ("analysis_results", "trash")),
+            ("_AXIOM_PREFIX", ("axiom_exports",)),
+            ("_AXIOM_TRASH_PREFIX", ("axiom_exports", "trash")),
+        ]:
+            monkeypatch.setattr(db, name, os.path.join(tmp_path, *path, ""))
+        return _save_token(
+            sample_token_data["token_address"],
+            sample_token_data["token_name"],
+            sample_token_data["token_symbol"],
+            sample_token_data["acronym"],
+            sample_early_bidders,
+        )
+
+    def test_move_and_restore(self, token_id: int, sample_token_data):
+        """Test files round-trip through trash and the stored paths follow them"""
+        analysis_path = db.get_analysis_file_path(token_id, sample_token_data["token_name"])
+        axiom_path = db.get_axiom_file_path(token_id, sample_token_data["acronym"])
+        for path in (analysis_path, axiom_path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write("{}")
+        db.update_token_file_paths(token_id, analysis_path, axiom_path)
+
+        assert db.move_files_to_trash(token_id) == (True, True)
+        assert not os.path.exists(analysis_path)
+        assert os.path.exists(db.get_analysis_file_path(token_id, sample_token_data["token_name"], in_trash=True))
+
+        assert db.restore_files_from_trash(token_id) == (True, True)
+        assert os.path.exists(analysis_path)
+        assert os.path.exists(axiom_path)
+
+    def test_missing_files_are_skipped(self, token_id: int, sample_token_data):
+        """Test recorded paths whose files no longer exist are reported as not moved"""
+        db.update_token_file_paths(
+            token_id,
+            db.get_analysis_file_path(token_id, sample_token_data["token_name"]),
+            db.get_axiom_file_path(token_id, sample_token_data["acronym"]),
+        )
+
+        assert db.move_files_to_trash(token_id) == (False, False)
+        assert db.delete_token_files(token_id) == (False, False)
+
+    def test_delete_without_recorded_paths(self, token_id: int):
+        """Test tokens without file paths, and unknown tokens, have nothing to delete"""
+        assert db.delete_token_files(token_id) == (False, False)
+        assert db.delete_token_files(token_id + 1) == (False, False)
@@ -0,0 +1,106 @@
+"""
+Tests for app.cache
+
+Tests the response cache directly, independent of the routers using it
+"""
+
+import asyncio
+
+import pytest
+
+from app.cache import ResponseCache
+
+
+class TestResponseCache:
+    """Test TTL expiry and size bounds"""
+
+    def test_set_and_get(self):
+        """Test a stored value is returned with its ETag"""
+        cache = ResponseCache()
+        etag = cache.set("tokens", {"total": 1})
+
+        assert cache.get("tokens") == ({"total": 1}, etag)
+
+    def test_expired_entry_dropped(self):
+        """Test entries past their TTL are reported missing and removed"""
+        cache = ResponseCache(ttl=0)
+        cache.set("tokens", {"total": 1})
+
+        assert cache.get("tokens") == (None, None)
+        assert "tokens" not in cache.cache
+
+    def test_least_recently_used_evicted(self):
+        """Test the entry not read for longest is evicted once the cache is full"""
+        cache = ResponseCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert list(cache.cache) == ["a", "c"]
+
+
+class TestInvalidate:
+    """Test prefix invalidation"""
+
+    def test_drops_keys_under_prefix(self):
+        """Test keys sharing the leading segments are dropped and others are kept"""
+        cache = ResponseCache()
+        for key in ("multi_early_buyer_wallets_2", "multi_early_buyer_wallets_3", "tokens_history", "codex"):
+            cache.set(key, key)
+
+        cache.invalidate("multi_early_buyer_wallets")
+
+        assert list(cache.cache) == ["tokens_history", "codex"]
+        assert "multi_early_buyer_wallets" not in cache.prefix_index
+
+    def test_matches_whole_segments_only(self):
+        """Test a prefix does not match part of a segment"""
+        cache = ResponseCache()
+        cache.set("tokens_history", 1)
+
+        cache.invalidate("token")
+
+        assert cache.get("tokens_history")[0] == 1
+
+
+class TestDeduplicateRequest:
+    """Test concurrent requests share a single fetch"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_fetch(self):
+        """Test callers arriving while a fetch is in flight get its result without fetching again"""
+        cache = ResponseCache()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(*(cache.deduplicate_request("tokens", fetch) for _ in range(5)))
+
+        assert results == [1] * 5
+        assert cache.pending_requests == {}
+
+    @pytest.mark.asyncio
+    async def test_failure_reaches_every_waiter(self):
+        """Test a failed fetch raises for all waiters and a later request fetches again"""
+        cache = ResponseCache()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("database unavailable")
+
+        results = await asyncio.gather(
+            *(cache.deduplicate_request("tokens", fail) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert cache.pending_requests == {}
+
+        async def fetch():
+            return "fresh"
+
+        assert await cache.deduplicate_request("tokens", fetch) == "fresh"
@@ -68,6 +68,10 @@ class TestSolanaAddressValidation:
             addr = "a" * 39 + char  # 40 chars with one invalid
             assert is_valid_solana_address(addr) is False
 
+        # Non-ASCII and trailing whitespace are rejected too
+        assert is_valid_solana_address("a" * 39 + "\u00e9") is False
+        assert is_valid_solana_address("a" * 40 + "\n") is False
+
 
 @pytest.mark.unit
 class TestTimestampFormatting: